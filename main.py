@@ -1,25 +1,34 @@
-import yaml
-from pathlib import Path
+import argparse
 from src.cli.job_description_cli import tailoring_resume_to_job_description
-
-def load_config():
-    config_path = Path("config.yaml")
-    if not config_path.exists():
-        raise FileNotFoundError("config.yaml not found in root directory")
-    
-    with open(config_path, "r") as f:
-        return yaml.safe_load(f)
+from src.utils.config import load_config
+from src.utils.profiling import profiling
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Tailor a resume to a job description')
+    parser.add_argument('--resume', help='Resume file (pdf or md) to parse in the background while the job description is processed')
+    parser.add_argument('--pdf_backend', choices=['latex', 'reportlab'],
+                        help='PDF renderer: latex for final copies, reportlab for fast previews (default from config.yaml)')
+    parser.add_argument('--profile', nargs='?', const='spans', choices=['spans', 'cprofile'],
+                        help='Time every stage and write a summary and a flamegraph file to logs/profiles/ '
+                             '(cprofile: also capture a cProfile of the main thread)')
+    args = parser.parse_args()
+    
     try:
         config = load_config()
-        tailoring_resume_to_job_description(
-            provider_for_parsing=config["job_description"]["provider"],
-            model_for_parsing=config["job_description"]["model"],
-            provider_for_resume=config["resume_description"]["provider"],
-            model_for_resume=config["resume_description"]["model"],
-            provider_for_tailoring=config["resume_tailoring"]["provider"],
-            model_for_tailoring=config["resume_tailoring"]["model"]
-        )
+        with profiling(args.profile, run_name="main"):
+            tailoring_resume_to_job_description(
+                provider_for_parsing=config["job_description"]["provider"],
+                model_for_parsing=config["job_description"]["model"],
+                provider_for_resume=config["resume_description"]["provider"],
+                model_for_resume=config["resume_description"]["model"],
+                provider_for_tailoring=config["resume_tailoring"]["provider"],
+                model_for_tailoring=config["resume_tailoring"]["model"],
+                tailoring_cascade=config["resume_tailoring"].get("cascade"),
+                tailoring_output_mode=config["resume_tailoring"].get("output_mode", "full"),
+                parsing_hedge=config["job_description"].get("hedge"),
+                resume_hedge=config["resume_description"].get("hedge"),
+                default_resume=args.resume or config["resume_description"].get("default_resume"),
+                pdf_backend=args.pdf_backend or config.get("pdf_generation", {}).get("backend", "latex")
+            )
     except Exception as e:
         print(f"Error: {e}") 
\ No newline at end of file
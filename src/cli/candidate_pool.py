@@ -0,0 +1,258 @@
+# Candidate pool mode: one job description, many resumes.
+# The job description is parsed once, the resumes are parsed and tailored concurrently into one
+# directory per candidate and the candidates are ranked by the assessment score of their tailored resume.
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from rich.table import Table
+
+from src.cli.job_description_cli import console, logger
+from src.daemon.client import run_task
+from src.utils.config import load_config
+from src.utils.profiling import profiling, with_current_spans
+from src.utils.run_manifest import RunManifest, run_stage
+
+RESUME_EXTENSIONS = {".pdf", ".md", ".markdown", ".json"}
+
+def collect_resumes(paths: List[str]) -> List[str]:
+    """
+    Expand the given files and directories into the list of resume files (pdf, md or already parsed json).
+    """
+    resumes = []
+    for path in paths:
+        if os.path.isdir(path):
+            resumes += sorted(str(file) for file in Path(path).iterdir() if file.suffix.lower() in RESUME_EXTENSIONS)
+        else:
+            resumes.append(path)
+    return resumes
+
+def candidate_ids(resume_paths: List[str]) -> List[str]:
+    """
+    Directory name of each candidate: the resume file name, numbered if several resumes share a name.
+    """
+    ids, seen = [], {}
+    for path in resume_paths:
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", Path(path).stem) or "candidate"
+        seen[name] = seen.get(name, 0) + 1
+        ids.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return ids
+
+def prepare_job_description(job_description_path: str, provider: str, model: str, hedge: Optional[dict] = None) -> str:
+    """
+    Parse the job description once for the whole pool, an already parsed JSON file is used as is.
+    """
+    if job_description_path.endswith(".json"):
+        return job_description_path
+    return run_task("extract_job_description", file_path=job_description_path, provider=provider, model=model, hedge=hedge)
+
+def parse_candidate(resume_path: str, candidate_dir: str, provider: str, model: str, hedge: Optional[dict] = None) -> str:
+    output_path = os.path.join(candidate_dir, "resume.json")
+    if resume_path.endswith(".json"):
+        os.makedirs(candidate_dir, exist_ok=True)
+        shutil.copy2(resume_path, output_path)
+        return output_path
+    return run_task("extract_resume", file_path=resume_path, provider=provider, model=model, hedge=hedge, output_path=output_path)
+
+def rank_candidates(candidates: List[Dict], job_description_json: dict) -> List[Dict]:
+    """
+    Sort the candidates by assessment score (then keyword coverage), failed candidates last.
+    """
+    from src.tailoring_resume.tailored_resume_json import extract_json, keyword_coverage
+    for candidate in candidates:
+        if candidate.get("tailored_resume"):
+            tailored = extract_json(candidate["tailored_resume"])
+            candidate["score"] = (tailored.get("assessment") or {}).get("score")
+            candidate["keyword_coverage"] = round(keyword_coverage(tailored, job_description_json), 2)
+    ranked = sorted(candidates, key=lambda candidate: (candidate.get("score") is None,
+                                                      -(candidate.get("score") or 0),
+                                                      -(candidate.get("keyword_coverage") or 0)))
+    for rank, candidate in enumerate(ranked, start=1):
+        candidate["rank"] = rank if candidate.get("score") is not None else None
+    return ranked
+
+def save_ranking(ranked: List[Dict], result_dir: str) -> str:
+    """
+    Save the ranking as ranking.json and ranking.csv, returns the path of the CSV file.
+    """
+    columns = ["rank", "candidate", "score", "keyword_coverage", "resume_file", "tailored_resume", "pdf", "error"]
+    with open(os.path.join(result_dir, "ranking.json"), "w") as file:
+        json.dump(ranked, file, indent=2)
+    csv_path = os.path.join(result_dir, "ranking.csv")
+    with open(csv_path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(ranked)
+    return csv_path
+
+def print_ranking(ranked: List[Dict], job_description_json: dict) -> None:
+    table = Table(title=f'Candidates for {job_description_json.get("job_title")} at {job_description_json.get("company_name")}')
+    for column in ["rank", "candidate", "score", "keyword coverage", "result"]:
+        table.add_column(column)
+    for candidate in ranked:
+        table.add_row(
+            str(candidate.get("rank") or "-"),
+            candidate["candidate"],
+            str(candidate.get("score") if candidate.get("score") is not None else "-"),
+            str(candidate.get("keyword_coverage") if candidate.get("keyword_coverage") is not None else "-"),
+            candidate.get("tailored_resume") or f'[red]{candidate.get("error")}[/red]',
+        )
+    console.print(table)
+
+def run_candidate_pool(job_description_path: str, resume_paths: List[str],
+                       provider_for_parsing: str, model_for_parsing: str,
+                       provider_for_resume: str, model_for_resume: str,
+                       provider_for_tailoring: str, model_for_tailoring: str,
+                       tailoring_cascade: Optional[dict] = None, parsing_hedge: Optional[dict] = None,
+                       resume_hedge: Optional[dict] = None, tailoring_output_mode: str = "full", concurrency: int = 4,
+                       output_dir: Optional[str] = None, pdf_backend: Optional[str] = None,
+                       manifest: Optional[RunManifest] = None) -> List[Dict]:
+    """
+    Tailor every resume of a candidate pool to one job description and rank the candidates.
+    Outputs go to <job description dir>/candidates/<candidate>/ (or `output_dir`), the ranking next to them.
+    At most `concurrency` resumes are parsed or tailored at once, a failing candidate does not stop the others.
+    With a `manifest`, every finished stage is checkpointed and stages already done with unchanged inputs are skipped.
+    """
+    # Imported here, the LLM SDKs are only needed in this process when no daemon is running
+    from src.tailoring_resume.tailored_resume_json import extract_json
+    
+    job_description_json_path = run_stage(
+        manifest, "job_description", "parse", [job_description_path],
+        lambda: prepare_job_description(job_description_path, provider_for_parsing, model_for_parsing, parsing_hedge),
+        params={"provider": provider_for_parsing, "model": model_for_parsing},
+    )
+    job_description_json = extract_json(job_description_json_path)
+    result_dir = output_dir or os.path.join(os.path.dirname(job_description_json_path), "candidates")
+    os.makedirs(result_dir, exist_ok=True)
+
+    candidates = [
+        {"candidate": candidate, "resume_file": resume_path, "dir": os.path.join(result_dir, candidate)}
+        for candidate, resume_path in zip(candidate_ids(resume_paths), resume_paths)
+    ]
+    logger.info(f"Candidate pool: {len(candidates)} resumes for {job_description_json_path}")
+
+    def parse(candidate: Dict) -> None:
+        try:
+            candidate["resume"] = run_stage(
+                manifest, candidate["candidate"], "resume_parse", [candidate["resume_file"]],
+                lambda: parse_candidate(candidate["resume_file"], candidate["dir"], provider_for_resume, model_for_resume, resume_hedge),
+                params={"provider": provider_for_resume, "model": model_for_resume},
+            )
+        except Exception as e:
+            logger.error(f'Parsing the resume of {candidate["candidate"]} failed: {e}')
+            candidate["error"] = f"resume parsing failed: {e}"
+
+    def tailor(candidate: Dict) -> None:
+        try:
+            candidate["tailored_resume"] = run_stage(
+                manifest, candidate["candidate"], "tailor", [candidate["resume"], job_description_json_path],
+                lambda: run_task("tailor_resume", resume_path=candidate["resume"], job_description_path=job_description_json_path,
+                                 provider=provider_for_tailoring, model=model_for_tailoring, cascade=tailoring_cascade,
+                                 output_dir=candidate["dir"], output_mode=tailoring_output_mode),
+                params={"provider": provider_for_tailoring, "model": model_for_tailoring, "cascade": tailoring_cascade,
+                        "output_mode": tailoring_output_mode},
+            )
+        except Exception as e:
+            logger.error(f'Tailoring the resume of {candidate["candidate"]} failed: {e}')
+            candidate["error"] = f"tailoring failed: {e}"
+
+    def render(candidate: Dict) -> None:
+        try:
+            candidate["pdf"] = run_stage(
+                manifest, candidate["candidate"], "pdf", [candidate["tailored_resume"]],
+                lambda: run_task("generate_resume", json_file_path=candidate["tailored_resume"], backend=pdf_backend),
+                params={"backend": pdf_backend},
+            )
+            if not candidate["pdf"]:
+                candidate["error"] = "PDF generation failed"
+        except Exception as e:
+            logger.error(f'Generating the PDF of {candidate["candidate"]} failed: {e}')
+            candidate["error"] = f"PDF generation failed: {e}"
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        with console.status(f"[bold green]Parsing {len(candidates)} resumes..."):
+            list(executor.map(with_current_spans(parse), candidates))
+
+        parsed = [candidate for candidate in candidates if candidate.get("resume")]
+        with console.status(f"[bold green]Tailoring {len(parsed)} resumes..."):
+            # All tailoring requests start with the same job description prefix. The first request runs alone
+            # to write the provider's prompt cache, the others then read the prefix from the cache.
+            if parsed:
+                tailor(parsed[0])
+            list(executor.map(with_current_spans(tailor), parsed[1:]))
+
+        tailored = [candidate for candidate in candidates if candidate.get("tailored_resume")]
+        if pdf_backend and tailored:
+            with console.status(f"[bold green]Rendering {len(tailored)} PDFs..."):
+                list(executor.map(with_current_spans(render), tailored))
+
+    for candidate in candidates:
+        candidate.pop("dir")
+    ranked = rank_candidates(candidates, job_description_json)
+    print_ranking(ranked, job_description_json)
+    csv_path = save_ranking(ranked, result_dir)
+    console.print(f"✅ Ranking saved to: {csv_path}", style="bold green")
+    if manifest:
+        console.print(f"Run manifest: {manifest.path} (continue an interrupted run with --resume_run)")
+    return ranked
+
+if __name__ == "__main__":
+    config = load_config()
+    pool_config = config.get("candidate_pool") or {}
+
+    parser = argparse.ArgumentParser(description='Tailor a pool of resumes to one job description and rank the candidates')
+    parser.add_argument('--job_description',
+                        help='Job description file (pdf, md or an already parsed job_description.json)')
+    parser.add_argument('--resumes', nargs='+',
+                        help='Resume files (pdf, md or parsed json) or directories containing them')
+    parser.add_argument('--concurrency', type=int, default=pool_config.get("concurrency", 4),
+                        help='Number of resumes parsed or tailored at once (default from config.yaml)')
+    parser.add_argument('--output_dir', help='Directory for the candidate outputs and the ranking (default: next to the job description)')
+    parser.add_argument('--pdf_backend', choices=['latex', 'reportlab', 'none'],
+                        default=pool_config.get("pdf_backend", "none"),
+                        help='Render a PDF per candidate (default from config.yaml)')
+    parser.add_argument('--resume_run', '--resume-run', nargs='?', const='latest', metavar='MANIFEST',
+                        help='Continue a previous run (default: the latest one in runs/), only failed, missing '
+                             'or changed stages are redone')
+    parser.add_argument('--profile', nargs='?', const='spans', choices=['spans', 'cprofile'],
+                        help='Time every stage and write a summary and a flamegraph file to logs/profiles/ '
+                             '(cprofile: also capture a cProfile of the main thread)')
+    args = parser.parse_args()
+
+    if args.resume_run:
+        manifest = RunManifest.load(None if args.resume_run == 'latest' else args.resume_run)
+        # Arguments given again on the command line override the ones of the run
+        arguments = {**manifest.arguments, **{key: value for key, value in vars(args).items()
+                                              if value is not None and parser.get_default(key) != value}}
+        manifest.arguments = arguments
+    else:
+        if not args.job_description or not args.resumes:
+            parser.error('--job_description and --resumes are required unless --resume_run is given')
+        arguments = vars(args)
+        manifest = RunManifest.create(arguments)
+
+    with profiling(args.profile, run_name="candidate_pool"):
+        run_candidate_pool(
+            job_description_path=arguments["job_description"],
+            resume_paths=collect_resumes(arguments["resumes"]),
+            provider_for_parsing=config["job_description"]["provider"],
+            model_for_parsing=config["job_description"]["model"],
+            provider_for_resume=config["resume_description"]["provider"],
+            model_for_resume=config["resume_description"]["model"],
+            provider_for_tailoring=config["resume_tailoring"]["provider"],
+            model_for_tailoring=config["resume_tailoring"]["model"],
+            tailoring_cascade=config["resume_tailoring"].get("cascade"),
+            parsing_hedge=config["job_description"].get("hedge"),
+            resume_hedge=config["resume_description"].get("hedge"),
+            tailoring_output_mode=config["resume_tailoring"].get("output_mode", "full"),
+            concurrency=arguments["concurrency"],
+            output_dir=arguments.get("output_dir"),
+            pdf_backend=None if arguments["pdf_backend"] == "none" else arguments["pdf_backend"],
+            manifest=manifest,
+        )
@@ -6,17 +6,17 @@ from rich.status import Status
 import json
 import tempfile
 import os
+import threading
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from datetime import date
 import logging
 from rich.logging import RichHandler
 from datetime import datetime
 
-from src.data_extraction.data_extraction_job_description import extract_job_description
-from src.data_extraction.data_extraction_resume import extract_resume
-from src.tailoring_resume.tailored_resume_json import tailor_resume
-from src.pdf_creation.generate_resume import generate_resume
+# The pipeline steps run in the warm daemon if one is running (python -m src.daemon.server), otherwise in-process
+from src.daemon.client import run_task
 
 console = Console()
 
@@ -73,7 +73,54 @@ def file_check(file_path: str) -> bool:
         return False
     return True
 
-def process_job_description(provider: str, model: str) -> Optional[str]:
+class ResumePrefetcher:
+    """
+    Parses resume files in background threads, so that the resume is ready by the time the user
+    gets to the resume step instead of costing a second sequential LLM round trip.
+    """
+    def __init__(self, provider: str, model: str, hedge: Optional[dict] = None):
+        self.provider = provider
+        self.model = model
+        self.hedge = hedge
+        self.futures: Dict[Tuple[str, float], Future] = {}
+
+    def _key(self, file_path: str) -> Optional[Tuple[str, float]]:
+        path = os.path.abspath(file_path)
+        if not os.path.isfile(path):
+            return None
+        # The modification time makes sure an edited file is parsed again
+        return path, os.path.getmtime(path)
+
+    def start(self, file_path: str) -> None:
+        """Start parsing a resume file in the background."""
+        key = self._key(file_path)
+        if key is None or key in self.futures or os.path.splitext(file_path)[1].lower() not in ['.md', '.pdf']:
+            return
+        
+        future = Future()
+        def parse():
+            try:
+                future.set_result(run_task("extract_resume", file_path=file_path, provider=self.provider, model=self.model, hedge=self.hedge))
+            except Exception as e:
+                future.set_exception(e)
+        
+        logger.info(f"Parsing resume in the background: {file_path}")
+        self.futures[key] = future
+        # Daemon thread, an unused speculative parse must not keep the CLI from exiting
+        threading.Thread(target=parse, daemon=True).start()
+
+    def get(self, file_path: str) -> Optional[str]:
+        """Wait for the background parse of a file, returns None if it was not prefetched or failed."""
+        key = self._key(file_path)
+        if key is None or key not in self.futures:
+            return None
+        try:
+            return self.futures[key].result()
+        except Exception as e:
+            logger.warning(f"Background resume parsing failed, parsing again: {e}")
+            return None
+
+def process_job_description(provider: str, model: str, hedge: Optional[dict] = None) -> Optional[str]:
     """Process job description from text or file input."""
     console.print(Panel.fit("Job Description Processor", style="bold blue"))
     
@@ -115,7 +162,7 @@ def process_job_description(provider: str, model: str) -> Optional[str]:
                     return None
             
             elif file_extension.lower() in ['.md', '.pdf']:
-                json_path = extract_job_description(file_path, provider=provider, model=model)
+                json_path = run_task("extract_job_description", file_path=file_path, provider=provider, model=model, hedge=hedge)
             else:
                 console.print(f"❌ Unsupported file type: {file_extension}", style="bold red")
                 return None
@@ -130,8 +177,9 @@ def process_job_description(provider: str, model: str) -> Optional[str]:
     
     return None
 
-def process_resume(provider: str, model: str) -> Optional[str]:
-    """Process resume from text or file input."""
+def process_resume(provider: str, model: str, hedge: Optional[dict] = None,
+                   prefetcher: Optional[ResumePrefetcher] = None, default_path: Optional[str] = None) -> Optional[str]:
+    """Process resume from text or file input, reusing a background parse of the same file if there is one."""
     console.print(Panel.fit("\nResume Processing", style="bold blue"))
     
     resume_input = Prompt.ask(
@@ -148,7 +196,11 @@ def process_resume(provider: str, model: str) -> Optional[str]:
                 temp_file.write(text)
                 file_path = temp_file.name
         else:
-            file_path = Prompt.ask("Enter the path to the resume file")
+            # Without a default, an empty answer is "" and fails the file check like before
+            if default_path:
+                file_path = Prompt.ask("Enter the path to the resume file", default=default_path)
+            else:
+                file_path = Prompt.ask("Enter the path to the resume file")
         
         with Status("[bold yellow]Processing resume...", spinner="dots") as status:
             if not file_check(file_path):
@@ -166,7 +218,9 @@ def process_resume(provider: str, model: str) -> Optional[str]:
                     return None
             
             elif file_extension.lower() in ['.md', '.pdf']:
-                json_path = extract_resume(file_path, provider=provider, model=model)
+                json_path = prefetcher.get(file_path) if prefetcher else None
+                if not json_path:
+                    json_path = run_task("extract_resume", file_path=file_path, provider=provider, model=model, hedge=hedge)
             else:
                 console.print(f"❌ Unsupported file type: {file_extension}", style="bold red")
                 return None
@@ -182,17 +236,20 @@ def process_resume(provider: str, model: str) -> Optional[str]:
     return None
 
 def process_tailored_resume(resume_path: str, job_desc_path: str, 
-                          provider: str, model: str) -> Optional[str]:
+                          provider: str, model: str, cascade: Optional[dict] = None, output_mode: str = "full") -> Optional[str]:
     """Generate tailored resume and optionally create PDF."""
     try:
         # Single status context for the entire tailoring process
         with Status("[bold yellow]Tailoring resume to job description...", spinner="dots") as status:
             # Generate tailored resume
-            tailored_path = tailor_resume(
+            tailored_path = run_task(
+                "tailor_resume",
                 resume_path=resume_path,
                 job_description_path=job_desc_path,
                 provider=provider,
-                model=model
+                model=model,
+                cascade=cascade,
+                output_mode=output_mode
             )
             logger.info(f"Successfully tailored resume: {tailored_path}")
             console.print(f"\n✅ Tailored resume saved to: [bold green]{tailored_path}[/]")
@@ -203,13 +260,14 @@ def process_tailored_resume(resume_path: str, job_desc_path: str,
         console.print(f"\n❌ Failed to process: {str(e)}", style="bold red")
         return None
 
-def generate_pdf_resume(tailored_path: str) -> Optional[str]:
-    """Generate a PDF version of the tailored resume."""
+def generate_pdf_resume(tailored_path: str, backend: str = "latex") -> Optional[str]:
+    """Generate a PDF version of the tailored resume with the given backend (latex or reportlab)."""
     try:
         # Update status for PDF generation if needed
         with Status("[bold yellow]Generating PDF resume...", spinner="dots") as status:
-            generate_resume(tailored_path)
-            pdf_path = os.path.join(os.path.dirname(tailored_path), 'tailored_resume.pdf')
+            pdf_path = run_task("generate_resume", json_file_path=tailored_path, backend=backend)
+            if not pdf_path:
+                raise RuntimeError("pdflatex failed, see the output above")
             logger.info(f"Successfully generated PDF: {pdf_path}")
             console.print(f"\n✅ PDF resume generated at: [bold green]{pdf_path}[/]")
             return pdf_path
@@ -225,16 +283,28 @@ def tailoring_resume_to_job_description(provider_for_parsing: str,
                                       provider_for_resume: str,
                                       model_for_resume: str,
                                       provider_for_tailoring: str,
-                                      model_for_tailoring: str) -> Optional[str]:
+                                      model_for_tailoring: str,
+                                      tailoring_cascade: Optional[dict] = None,
+                                      tailoring_output_mode: str = "full",
+                                      parsing_hedge: Optional[dict] = None,
+                                      resume_hedge: Optional[dict] = None,
+                                      default_resume: Optional[str] = None,
+                                      pdf_backend: str = "latex") -> Optional[str]:
     """
     Orchestrates the complete process of processing a job description,
     processing a resume, and creating a tailored version.
+    If `default_resume` is given, it is parsed in the background while the job description is processed.
     """
+    prefetcher = ResumePrefetcher(provider=provider_for_resume, model=model_for_resume, hedge=resume_hedge)
+    if default_resume:
+        prefetcher.start(default_resume)
+    
     try:
         # Step 1: Process job description
         job_desc_path = process_job_description(
             provider=provider_for_parsing,
-            model=model_for_parsing
+            model=model_for_parsing,
+            hedge=parsing_hedge
         )
         if not job_desc_path:
             return None
@@ -243,7 +313,10 @@ def tailoring_resume_to_job_description(provider_for_parsing: str,
         if Confirm.ask("\nWould you like to process a resume now?"):
             resume_path = process_resume(
                 provider=provider_for_resume,
-                model=model_for_resume
+                model=model_for_resume,
+                hedge=resume_hedge,
+                prefetcher=prefetcher,
+                default_path=default_resume
             )
             if not resume_path:
                 return None
@@ -254,14 +327,16 @@ def tailoring_resume_to_job_description(provider_for_parsing: str,
                     resume_path=resume_path,
                     job_desc_path=job_desc_path,
                     provider=provider_for_tailoring,
-                    model=model_for_tailoring
+                    model=model_for_tailoring,
+                    cascade=tailoring_cascade,
+                    output_mode=tailoring_output_mode
                 )
                 if not tailored_path:
                     return None
 
                 # Step 4: Generate PDF resume (if user wants to)
                 if Confirm.ask("\nWould you like to generate a PDF version of the tailored resume?"):
-                    pdf_path = generate_pdf_resume(tailored_path)
+                    pdf_path = generate_pdf_resume(tailored_path, backend=pdf_backend)
                     if not pdf_path:
                         return None
 
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+from src.daemon.tasks import resolve_task
+from src.utils.profiling import span
+
+logger = logging.getLogger("resume_builder")
+
+CONNECT_TIMEOUT = 1.0
+
+class DaemonTaskError(RuntimeError):
+    """Raised when a task submitted to the daemon failed there."""
+
+def socket_dir() -> Path:
+    """
+    Per-user directory of the daemon sockets: $XDG_RUNTIME_DIR/resume_builder or else resume_builder-<uid> in the temp dir.
+    """
+    if os.getenv("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "resume_builder"
+    return Path(tempfile.gettempdir()) / f"resume_builder-{os.getuid()}"
+
+def private_socket_dir() -> Path:
+    """
+    Create the socket directory readable by the current user only, raises PermissionError if it
+    already exists and someone else owns it or can write to it.
+    """
+    directory = socket_dir()
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = directory.lstat()
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{directory} is not a private directory of the current user")
+    return directory
+
+def socket_path() -> Path:
+    """
+    Socket of the daemon serving the current working directory (task paths are relative to it),
+    RESUME_BUILDER_SOCKET overrides it.
+    """
+    if os.getenv("RESUME_BUILDER_SOCKET"):
+        return Path(os.environ["RESUME_BUILDER_SOCKET"])
+    directory_hash = hashlib.sha1(os.getcwd().encode()).hexdigest()[:12]
+    return socket_dir() / f"{directory_hash}.sock"
+
+def check_socket_owner(path: Path) -> None:
+    """
+    Tasks carry resume data and their results are trusted, so only talk to a daemon started by the current user.
+    """
+    info = path.lstat()
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not a socket owned by the current user")
+
+def connect() -> socket.socket:
+    """
+    Connect to the daemon, raises ConnectionError (or FileNotFoundError) if none is running
+    and PermissionError if the socket belongs to someone else.
+    """
+    path = socket_path()
+    check_socket_owner(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        raise
+    # Tasks run LLM calls and LaTeX, so there is no timeout once connected
+    sock.settimeout(None)
+    return sock
+
+def send_request(sock: socket.socket, request: Dict[str, Any]) -> Dict[str, Any]:
+    with sock:
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        line = sock.makefile("rb").readline()
+    if not line:
+        raise DaemonTaskError(f'The daemon closed the connection while running {request.get("task")}')
+    return json.loads(line)
+
+def request_daemon(task: str, **kwargs) -> Dict[str, Any]:
+    return send_request(connect(), {"task": task, "kwargs": kwargs, "cwd": os.getcwd()})
+
+def run_task(task: str, **kwargs) -> Any:
+    """
+    Run a pipeline task (see src/daemon/tasks.py) in the warm daemon if one is running, otherwise in this process.
+    A task that failed in the daemon is not repeated locally, it may already have made paid LLM calls.
+    """
+    if socket_path().exists() and not os.getenv("RESUME_BUILDER_NO_DAEMON"):
+        try:
+            sock = connect()
+        except PermissionError as e:
+            logger.warning(f"Ignoring daemon socket: {e}, running in-process")
+        except OSError:
+            logger.debug("No daemon listening, running in-process")
+        else:
+            with span(f"daemon:{task}"):
+                response = send_request(sock, {"task": task, "kwargs": kwargs, "cwd": os.getcwd()})
+            if response["ok"]:
+                return response["result"]
+            if not response.get("run_locally"):
+                raise DaemonTaskError(f'{response["error_type"]}: {response["error"]}')
+            logger.info(f'Daemon cannot run {task} ({response["error"]}), running in-process')
+    return resolve_task(task)(**kwargs)
@@ -0,0 +1,147 @@
+# Long-lived local daemon keeping the expensive state of the pipeline warm between CLI invocations:
+# imported SDKs, LLM clients with their connection pools, prepared response schemas, the parsed config,
+# the Jinja templates and the compiled PDF cache. The CLI and the batch commands submit their tasks to it
+# over a Unix socket (src/daemon/client.py) and run them in-process when no daemon is running.
+import argparse
+import json
+import logging
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+# Add the project root directory to the Python path
+project_root = str(Path(__file__).resolve().parents[2])
+sys.path.append(project_root)
+
+from src.daemon.client import connect, private_socket_dir, request_daemon, socket_path
+from src.daemon.tasks import TASKS, resolve_task
+from src.utils.config import load_config
+
+logger = logging.getLogger("resume_builder")
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """
+    One JSON request per connection: {"task", "kwargs", "cwd"}, answered with
+    {"ok": true, "result"} or {"ok": false, "error", "error_type"}.
+    """
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        task = request.get("task")
+        if task == "status":
+            response = {"ok": True, "result": self.server.status()}
+        elif task == "shutdown":
+            response = {"ok": True, "result": "shutting down"}
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif request.get("cwd") != os.getcwd():
+            # Task paths are relative to the client's working directory
+            response = {"ok": False, "run_locally": True, "error_type": "WorkingDirectory",
+                        "error": f"daemon serves {os.getcwd()}"}
+        else:
+            response = self.run(task, request.get("kwargs") or {})
+        self.wfile.write(json.dumps(response, default=str).encode() + b"\n")
+
+    def run(self, task: str, kwargs: dict) -> dict:
+        start = time.perf_counter()
+        try:
+            result = resolve_task(task)(**kwargs)
+        except Exception as e:
+            logger.error(f"Task {task} failed: {e}\n{traceback.format_exc()}")
+            return {"ok": False, "error_type": type(e).__name__, "error": str(e)}
+        finally:
+            self.server.count_task()
+        logger.info(f"Task {task} done in {time.perf_counter() - start:.2f}s")
+        return {"ok": True, "result": result}
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        super().__init__(path, DaemonHandler)
+        self.started = time.time()
+        self.tasks_served = 0
+        # Requests are handled in parallel threads
+        self._lock = threading.Lock()
+
+    def count_task(self) -> None:
+        with self._lock:
+            self.tasks_served += 1
+
+    def status(self) -> dict:
+        return {"pid": os.getpid(), "cwd": os.getcwd(), "uptime_s": round(time.time() - self.started, 1),
+                "tasks_served": self.tasks_served}
+
+def warm_up() -> None:
+    """
+    Import the task modules and build everything that is reused across requests.
+    """
+    from src.utils.llm_factory import get_llm_factory
+    from src.utils.schema import prepared_response_model
+    from src.pdf_creation.generate_resume import get_jinja_env
+    from src.data_extraction.data_extraction_job_description import JobDescription
+    from src.data_extraction.data_extraction_resume import Resume as ParsedResume
+    from src.tailoring_resume.tailored_resume_json import Resume as TailoredResume
+
+    for task in TASKS:
+        resolve_task(task)
+    config = load_config()
+    providers = {config[stage]["provider"] for stage in ["job_description", "resume_description", "resume_tailoring"]}
+    for provider in providers:
+        get_llm_factory(provider)
+    for model in [JobDescription, ParsedResume, TailoredResume]:
+        prepared_response_model(model)
+    get_jinja_env().get_template("resume.tex.jinja")
+    logger.info(f"Warmed up clients for {', '.join(sorted(providers))}")
+
+def serve() -> None:
+    if not os.getenv("RESUME_BUILDER_SOCKET"):
+        private_socket_dir()
+    path = socket_path()
+    if path.exists():
+        try:
+            connect().close()
+            print(f"A daemon is already listening on {path}")
+            return
+        except PermissionError as e:
+            print(f"Not replacing {path}: {e}")
+            return
+        except OSError:
+            # Left behind by a daemon that did not shut down cleanly
+            path.unlink()
+
+    warm_up()
+    # Create the socket with mode 0600 right away, a chmod after bind leaves a window for other users to connect
+    previous_umask = os.umask(0o177)
+    try:
+        server = DaemonServer(str(path))
+    finally:
+        os.umask(previous_umask)
+    signal.signal(signal.SIGTERM, lambda *args: threading.Thread(target=server.shutdown, daemon=True).start())
+    logger.info(f"Daemon listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+        logger.info("Daemon stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Warm background daemon for the resume builder CLI')
+    parser.add_argument('command', nargs='?', choices=['start', 'status', 'stop'], default='start',
+                        help='start runs the daemon in the foreground for the current directory (default: start)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.command == 'start':
+        serve()
+    else:
+        try:
+            print(request_daemon('status' if args.command == 'status' else 'shutdown')["result"])
+        except OSError:
+            print(f"No daemon running for {os.getcwd()}")
@@ -0,0 +1,17 @@
+import importlib
+from typing import Callable, Dict
+
+# Pipeline steps that can run in the daemon, by name. Imported lazily, so thin clients do not load the LLM SDKs.
+TASKS: Dict[str, str] = {
+    "extract_job_description": "src.data_extraction.data_extraction_job_description:extract_job_description",
+    "extract_resume": "src.data_extraction.data_extraction_resume:extract_resume",
+    "tailor_resume": "src.tailoring_resume.tailored_resume_json:tailor_resume",
+    "tailor_resume_incremental": "src.tailoring_resume.tailored_resume_json:tailor_resume_incremental",
+    "generate_resume": "src.pdf_creation.generate_resume:generate_resume",
+}
+
+def resolve_task(name: str) -> Callable:
+    if name not in TASKS:
+        raise ValueError(f"Unknown task: {name}")
+    module, function = TASKS[name].split(":")
+    return getattr(importlib.import_module(module), function)
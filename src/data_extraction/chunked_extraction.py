@@ -0,0 +1,181 @@
+# This script parses documents that are too long for a single request: the text is split on section
+# boundaries, the chunks are parsed concurrently into partial objects and the parts are merged deterministically.
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Type
+from pydantic import BaseModel
+from src.utils.llm_factory import LLMFactory
+from src.utils.schema import partial_model, schema_tokens
+from src.utils.tokens import estimate_tokens, max_document_tokens
+
+# Lines that start a new section: markdown headings, short all-caps lines and common resume / job posting headings
+SECTION_HEADING = re.compile(
+    r"^\s*(#{1,6}\s+\S.*"
+    r"|[A-Z][A-Z0-9 &/,\-]{2,40}:?"
+    r"|(?i:summary|profile|experience|work experience|professional experience|employment|education|skills|technical skills"
+    r"|projects|certifications?|publications|awards|honors|teaching|research|talks|about (us|the role)|responsibilities"
+    r"|requirements|qualifications|preferred qualifications|benefits|what you.ll do|who you are)\s*:?)\s*$"
+)
+
+CHUNK_INSTRUCTIONS = """
+This is part {index} of {total} of a longer document, the other parts are parsed separately.
+Extract only the information found in this part and leave everything else empty (null)."""
+
+def split_sections(text: str) -> List[str]:
+    """
+    Split a document into sections, starting a new section at every heading line.
+    """
+    sections, current = [], []
+    for line in text.splitlines():
+        if SECTION_HEADING.match(line) and any(existing.strip() for existing in current):
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return sections
+
+def chunk_text(text: str, max_chunk_tokens: int) -> List[str]:
+    """
+    Pack consecutive sections into chunks of at most `max_chunk_tokens` (estimated).
+    Sections that are too long on their own are split on line boundaries.
+    Token counts are kept as running sums of the lines, so every line is only tokenized once.
+    """
+    # (text, tokens) of sections or parts of sections
+    pieces = []
+    for section in split_sections(text):
+        part, part_tokens = [], 0
+        for line in section.splitlines():
+            line_tokens = estimate_tokens(line)
+            if part and part_tokens + line_tokens > max_chunk_tokens:
+                pieces.append(("\n".join(part), part_tokens))
+                part, part_tokens = [], 0
+            part.append(line)
+            part_tokens += line_tokens
+        if part:
+            pieces.append(("\n".join(part), part_tokens))
+
+    chunks, current, current_tokens = [], [], 0
+    for piece, piece_tokens in pieces:
+        if current and current_tokens + piece_tokens > max_chunk_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def chunk_token_limit(model: str, response_model: Type[BaseModel], max_chunk_tokens: int) -> int:
+    """
+    Chunk size for parsing a document with a model: `max_chunk_tokens`, lowered for models whose
+    context window or output limit cannot hold a chunk of that size together with its parsed response.
+    """
+    return min(max_chunk_tokens, max_document_tokens(model, schema_tokens(response_model), response_model.model_json_schema()))
+
+def extract_in_chunks(client: LLMFactory, model: str, system_prompt: str, text: str,
+                      response_model: Type[BaseModel], max_chunk_tokens: int) -> List[Dict[str, Any]]:
+    """
+    Parse the chunks of a long document concurrently into partial objects of the response model.
+    Returns the parts as dictionaries in document order.
+    """
+    chunks = chunk_text(text, max_chunk_tokens)
+    requests = [
+        {
+            "response_model": partial_model(response_model),
+            "messages": [
+                {"role": "system", "content": system_prompt + CHUNK_INSTRUCTIONS.format(index=index + 1, total=len(chunks))},
+                {"role": "user", "content": chunk}
+            ],
+        }
+        for index, chunk in enumerate(chunks)
+    ]
+    results = client.create_completion_batch(requests, model=model)
+    return [response.model_dump() for response, completion in results]
+
+def normalize(value: Any) -> str:
+    """
+    Comparison key for deduplication: lower case, alphanumeric words only.
+    """
+    return " ".join(re.findall(r"[a-z0-9+#]+", str(value or "").lower()))
+
+def merge_values(values: List[Any]) -> List[Any]:
+    """
+    Union of scalar values keeping the first occurrence of each normalized value.
+    """
+    merged, seen = [], set()
+    for value in values:
+        if value is None or normalize(value) in seen:
+            continue
+        seen.add(normalize(value))
+        merged.append(value)
+    return merged
+
+def merge_objects(items: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """
+    Merge dictionaries describing the same thing: the first non-empty value wins for scalars,
+    lists are merged (lists of dictionaries are concatenated, the caller deduplicates them).
+    """
+    items = [item for item in items if item]
+    if not items:
+        return None
+    merged = {}
+    for key in dict.fromkeys(key for item in items for key in item):
+        values = [item.get(key) for item in items if item.get(key) not in (None, "", [])]
+        if not values:
+            merged[key] = items[0].get(key)
+        elif isinstance(values[0], list):
+            flattened = [value for sublist in values for value in sublist]
+            merged[key] = flattened if flattened and isinstance(flattened[0], dict) else merge_values(flattened)
+        elif isinstance(values[0], dict):
+            merged[key] = merge_objects(values)
+        else:
+            merged[key] = values[0]
+    return merged
+
+def merge_entries(entries: List[Dict[str, Any]], key: Callable[[Dict[str, Any]], tuple]) -> List[Dict[str, Any]]:
+    """
+    Deduplicate list entries (experiences, certifications, ...) by key, merging duplicates in order of appearance.
+    """
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        groups.setdefault(key(entry), []).append(entry)
+    return [merge_objects(group) for group in groups.values()]
+
+def merge_resume_parts(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge partially parsed resumes into one, deduplicating experiences, educations,
+    certifications, projects and skills.
+    """
+    def entries(section: str, field: str) -> List[Dict[str, Any]]:
+        return [entry for part in parts for entry in ((part.get(section) or {}).get(field) or [])]
+
+    merged = merge_objects([{key: value for key, value in part.items() if key in ("contact_info", "summary", "media")} for part in parts]) or {}
+    merged["experiences"] = {"work_experience": merge_entries(
+        entries("experiences", "work_experience"),
+        key=lambda entry: (normalize(entry.get("company")), normalize(entry.get("role")), normalize(entry.get("from_date"))),
+    )}
+    merged["educations"] = {"education": merge_entries(
+        entries("educations", "education"),
+        key=lambda entry: (normalize(entry.get("degree")), normalize(entry.get("university"))),
+    )}
+    merged["certifications_trainings"] = {"certifications_trainings": merge_entries(
+        entries("certifications_trainings", "certifications_trainings"),
+        key=lambda entry: (normalize(entry.get("name")),),
+    )}
+    merged["projects"] = {"projects": merge_entries(
+        entries("projects", "projects"),
+        key=lambda entry: (normalize(entry.get("name")),),
+    )}
+    merged["skill_sections"] = merge_entries(
+        [section for part in parts for section in (part.get("skill_sections") or [])],
+        key=lambda entry: (normalize(entry.get("name")),),
+    )
+    return merged
+
+def merge_job_description_parts(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge partially parsed job descriptions: first non-empty title, company, location and type,
+    deduplicated union of all list fields.
+    """
+    return merge_objects(parts) or {}
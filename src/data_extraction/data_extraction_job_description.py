@@ -9,10 +9,14 @@ from datetime import date
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv, find_dotenv
 import sys
-from src.utils.llm_factory import LLMFactory
+from src.utils.llm_factory import get_llm_factory
+from src.utils.tokens import estimate_tokens
+from src.utils.profiling import profiled
+from src.data_extraction.chunked_extraction import chunk_token_limit, extract_in_chunks, merge_job_description_parts
 
 load_dotenv(find_dotenv(usecwd=True))
 
+@profiled("pdf_text_extraction")
 def extract_pdf_text(pdf_path: str) -> str:
     """
     Extract text from a PDF file.
@@ -60,23 +64,38 @@ class JobDescription(BaseModel):
     job_benefits: Optional[List[str]] = Field(description="The benefits of the job.")
     keywords: Optional[List[str]] = Field(description="The keywords of the job that might be useful for the resume search.")
 
-def extract_job_description(file_path: str, provider: str = "openai", model: str = "gpt-4o-mini") -> str:
+@profiled("job_description_parse")
+def extract_job_description(file_path: str, provider: str = "openai", model: str = "gpt-4o-mini", hedge: Optional[dict] = None,
+                            max_chunk_tokens: Optional[int] = 6000) -> str:
     """
     Main function to extract the job description from a file.
     Cheapest option is OpenAI gpt-4o-mini is choosen as the task is easy.
+    If `hedge` (backup provider and model, see config.yaml) is given, a slow primary request is hedged with the backup.
+    Documents longer than `max_chunk_tokens` (lower for models with a small context or output limit)
+    are split on section boundaries, parsed concurrently and merged.
     """
-    client = LLMFactory(provider=provider) 
+    client = get_llm_factory(provider) 
    
     job_description_text = extract_text(file_path)
     
-    response, completion = client.create_completion(
-        model=model,
-        messages=[
-            {"role": "system", "content": "You are a job description parser. Parse the job description and extract the data according to the schema."},
-            {"role": "user", "content": job_description_text}
-        ],
-        response_model=JobDescription,
-    )
+    system_prompt = "You are a job description parser. Parse the job description and extract the data according to the schema."
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": job_description_text}
+    ]
+    if max_chunk_tokens:
+        max_chunk_tokens = chunk_token_limit(model, JobDescription, max_chunk_tokens)
+    if max_chunk_tokens and estimate_tokens(job_description_text, model) > max_chunk_tokens:
+        parts = extract_in_chunks(client, model, system_prompt, job_description_text, JobDescription, max_chunk_tokens)
+        response = JobDescription.model_validate(merge_job_description_parts(parts))
+    elif hedge:
+        response, completion = client.create_completion_hedged(
+            model=model, messages=messages, response_model=JobDescription, hedge=hedge, stage="job_description"
+        )
+    else:
+        response, completion = client.create_completion(
+            model=model, messages=messages, response_model=JobDescription
+        )
     
     # Create job results directory name
     job_name = response.job_title.replace(" ", "_")
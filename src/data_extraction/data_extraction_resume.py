@@ -15,7 +15,11 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
-from src.utils.llm_factory import LLMFactory
+from src.utils.llm_factory import get_llm_factory
+from src.utils.tokens import estimate_tokens
+from src.utils.profiling import profiled
+from src.data_extraction.chunked_extraction import chunk_token_limit, extract_in_chunks, merge_resume_parts
+from src.data_extraction.skill_matcher import extract_skills, format_skill_groups, without_contact_details
 
 load_dotenv(find_dotenv(usecwd=True))
 
@@ -30,6 +34,7 @@ def extract_text(file_path: str) -> str:
     else:
         raise ValueError(f"Unsupported file type: {file_extension}")
 
+@profiled("pdf_text_extraction")
 def extract_pdf_text(pdf_path: str) -> str:
     resume_text = ""
     with open(pdf_path, 'rb') as file:
@@ -119,31 +124,57 @@ class Resume(BaseModel):
     projects: Projects = Field(description="Projects of the person.")
     skill_sections: List[SkillSection] = Field(description="List of skills inferred from the resume grouped by meaningful categories.")
 
-def extract_resume(file_path: str, provider: str = "openai", model: str = "gpt-4o-mini") -> str:
+@profiled("resume_parse")
+def extract_resume(file_path: str, provider: str = "openai", model: str = "gpt-4o-mini", hedge: Optional[dict] = None,
+                   max_chunk_tokens: Optional[int] = 6000, output_path: Optional[str] = None) -> str:
     """
-    Extract data from a resume file and save the response to a JSON file.
+    Extract data from a resume file and save the response to a JSON file,
+    `output_path` or resumes/resume_<date>.json in the project by default.
     Returns the path to the saved JSON file.
+    If `hedge` (backup provider and model, see config.yaml) is given, a slow primary request is hedged with the backup.
+    Resumes longer than `max_chunk_tokens` (e.g. academic CVs, lower for models with a small context
+    or output limit) are split on section boundaries, parsed concurrently and merged.
+    Skills of the local taxonomy (src/data_extraction/skill_taxonomy.yaml) are matched in the text beforehand
+    and passed as candidates, the model confirms and groups them together with the skills the taxonomy misses.
     """ 
-    client = LLMFactory(provider=provider)
+    client = get_llm_factory(provider)
     if provider == "openai" and not model.startswith("gpt"):
         raise ValueError("Only OpenAI models starting with gpt are supported.")
     
     resume_text = extract_text(file_path)
-    response, completion = client.create_completion(
-        model=model,
-        messages=[
-            {"role": "system", "content": """You are a resume parser. Parse the resume and extract the data according to the schema.
-             If the fields are not exactly as in the schema, try to infer the most likely meaning."""},
-            {"role": "user", "content": resume_text}
-        ],
-        response_model=Resume,
-    )
+    system_prompt = """You are a resume parser. Parse the resume and extract the data according to the schema.
+         If the fields are not exactly as in the schema, try to infer the most likely meaning."""
+    known_skills = extract_skills(without_contact_details(resume_text))
+    if known_skills:
+        system_prompt += f"""
+         A keyword search found these candidate skills in the resume. Put each one in skill_sections only if the resume really shows it
+         (a matched word can also be part of a name, a company or an unrelated phrase), list the most prominent skills first,
+         add the skills the search missed and use these group names where they fit:
+{format_skill_groups(known_skills)}"""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": resume_text}
+    ]
+    if max_chunk_tokens:
+        max_chunk_tokens = chunk_token_limit(model, Resume, max_chunk_tokens)
+    if max_chunk_tokens and estimate_tokens(resume_text, model) > max_chunk_tokens:
+        parts = extract_in_chunks(client, model, system_prompt, resume_text, Resume, max_chunk_tokens)
+        response = Resume.model_validate(merge_resume_parts(parts))
+    elif hedge:
+        response, completion = client.create_completion_hedged(
+            model=model, messages=messages, response_model=Resume, hedge=hedge, stage="resume"
+        )
+    else:
+        response, completion = client.create_completion(
+            model=model, messages=messages, response_model=Resume
+        )
     
     # Save the response to a json file in the specified directory
-    save_dir = Path('/home/artur/github/personal/Resume-Builder/resumes')
-    save_dir.mkdir(parents=True, exist_ok=True)
-    
-    saved_path = save_dir / f'resume_{date.today().strftime("%Y-%m-%d")}.json'
+    if output_path:
+        saved_path = Path(output_path)
+    else:
+        saved_path = project_root / 'resumes' / f'resume_{date.today().strftime("%Y-%m-%d")}.json'
+    saved_path.parent.mkdir(parents=True, exist_ok=True)
     
     with open(saved_path, 'w') as file:
         json.dump(response.model_dump(), file, indent=2)
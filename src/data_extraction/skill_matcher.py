@@ -0,0 +1,208 @@
+import logging
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import yaml
+
+logger = logging.getLogger("resume_builder")
+
+TAXONOMY_PATH = Path(__file__).resolve().parent / "skill_taxonomy.yaml"
+
+# Resume sections that name the person rather than their skills (a "Julia Swift" is neither)
+CONTACT_SECTIONS = ("contact_info", "media")
+CONTACT_DETAILS = re.compile(r"\S*@\S*|\S*(?:https?://|www\.|\.com/|\.io/|\.me/)\S*|\+?\d[\d ()./-]{9,}\d")
+
+# group -> canonical skill -> {"aliases": [...], "match_name": bool}
+Taxonomy = Dict[str, Dict[str, Dict[str, Any]]]
+
+def normalize(text: str) -> str:
+    # Case and whitespace differences do not matter for matching
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+def is_word_character(character: str) -> bool:
+    return character.isalnum() or character == "_"
+
+def parse_skill(value: Any) -> Dict[str, Any]:
+    """
+    A taxonomy skill maps to its aliases, or to {"aliases": [...], "match_name": false} when the
+    canonical name alone is ambiguous (a first name, a common word) and only the aliases should match.
+    """
+    if isinstance(value, dict):
+        return {"aliases": [str(alias) for alias in value.get("aliases") or []], "match_name": bool(value.get("match_name", True))}
+    return {"aliases": [str(alias) for alias in value or []], "match_name": True}
+
+class SkillMatcher:
+    """
+    Finds the skills of a taxonomy (see load_taxonomy) in a text in one pass
+    with an Aho-Corasick automaton over all aliases. Matches have to start and end on word boundaries,
+    overlapping matches are resolved to the leftmost longest one ("Apache Spark" rather than "Spark").
+    """
+    def __init__(self, taxonomy: Taxonomy):
+        self.group_of: Dict[str, str] = {}
+        self.canonical: Dict[str, str] = {}
+        # Trie transitions, failure links and the (alias length, canonical skill) ending in each state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+
+        for group, skills in taxonomy.items():
+            for skill, entry in (skills or {}).items():
+                skill = str(skill)
+                self.group_of[skill] = group
+                # Unmatched names still resolve to themselves in canonical_name
+                self.canonical.setdefault(normalize(skill), skill)
+                for alias in ([skill] if entry["match_name"] else []) + entry["aliases"]:
+                    alias = normalize(alias)
+                    if alias and self.canonical.setdefault(alias, skill) == skill:
+                        self._add(alias, skill)
+        self._build_failure_links()
+
+    def _add(self, alias: str, skill: str) -> None:
+        state = 0
+        for character in alias:
+            if character not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][character] = len(self._goto) - 1
+            state = self._goto[state][character]
+        self._output[state].append((len(alias), skill))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(character, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[str]:
+        """
+        Canonical names of the skills mentioned in a text, in order of first mention.
+        """
+        text = normalize(text)
+        matches = []
+        state = 0
+        for end, character in enumerate(text, start=1):
+            while state and character not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(character, 0)
+            for length, skill in self._output[state]:
+                start = end - length
+                if (start == 0 or not is_word_character(text[start - 1])) and (end == len(text) or not is_word_character(text[end])):
+                    matches.append((start, end, skill))
+
+        skills = []
+        covered_until = 0
+        for start, end, skill in sorted(matches, key=lambda match: (match[0], -match[1])):
+            if start >= covered_until:
+                covered_until = end
+                if skill not in skills:
+                    skills.append(skill)
+        return skills
+
+    def group(self, skills: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Group canonical skill names by their taxonomy group, keeping their order.
+        """
+        grouped: Dict[str, List[str]] = {}
+        for skill in skills:
+            grouped.setdefault(self.group_of[skill], []).append(skill)
+        return grouped
+
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """
+        Skills mentioned in a text grouped by taxonomy group.
+        """
+        return self.group(self.find(text))
+
+    def canonical_name(self, skill: str) -> str:
+        """
+        Canonical name of a skill written in any of its aliases, the normalized text for unknown skills.
+        """
+        return self.canonical.get(normalize(skill), normalize(skill))
+
+def load_taxonomy(paths: Iterable[Path]) -> Taxonomy:
+    """
+    Merge taxonomy files, later files add groups, skills and aliases to earlier ones
+    and can turn off matching of a canonical name.
+    """
+    taxonomy: Taxonomy = {}
+    for path in paths:
+        with open(path, "r") as file:
+            for group, skills in (yaml.safe_load(file) or {}).items():
+                for skill, value in (skills or {}).items():
+                    entry = parse_skill(value)
+                    existing = taxonomy.setdefault(group, {}).setdefault(str(skill), {"aliases": [], "match_name": True})
+                    existing["aliases"].extend(alias for alias in entry["aliases"] if alias not in existing["aliases"])
+                    existing["match_name"] = existing["match_name"] and entry["match_name"]
+    return taxonomy
+
+def taxonomy_paths() -> List[Path]:
+    """
+    The bundled taxonomy followed by the files listed in SKILL_TAXONOMY (separated by ":").
+    """
+    extra = [Path(path) for path in os.getenv("SKILL_TAXONOMY", "").split(os.pathsep) if path]
+    return [TAXONOMY_PATH, *extra]
+
+@lru_cache(maxsize=None)
+def _matcher(paths: Tuple[Path, ...], mtimes: Tuple[float, ...]) -> SkillMatcher:
+    matcher = SkillMatcher(load_taxonomy(paths))
+    logger.debug(f"Loaded skill taxonomy with {len(matcher.canonical)} aliases from {len(paths)} file(s)")
+    return matcher
+
+def get_skill_matcher() -> SkillMatcher:
+    """
+    Matcher for the bundled and configured taxonomies, rebuilt only when a taxonomy file changes.
+    """
+    paths = tuple(taxonomy_paths())
+    return _matcher(paths, tuple(path.stat().st_mtime for path in paths))
+
+def extract_skills(text: str) -> Dict[str, List[str]]:
+    return get_skill_matcher().extract(text)
+
+def format_skill_groups(grouped: Dict[str, List[str]]) -> str:
+    return "\n".join(f"- {group}: {', '.join(skills)}" for group, skills in grouped.items())
+
+def without_contact_details(text: str) -> str:
+    """
+    Resume text without its first line (the name), email addresses, URLs and phone numbers.
+    """
+    lines = text.strip().splitlines()[1:]
+    return CONTACT_DETAILS.sub(" ", "\n".join(lines))
+
+def without_contact_sections(resume_json: dict) -> dict:
+    """
+    Parsed or tailored resume without the sections naming the person, for matching its skills.
+    """
+    return {section: value for section, value in resume_json.items() if section not in CONTACT_SECTIONS}
+
+def resume_text(resume_json: dict) -> str:
+    """
+    The text values of a parsed or tailored resume (no JSON keys), without the sections naming the person.
+    """
+    def strings(value):
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield from strings(item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from strings(item)
+    return "\n".join(strings(without_contact_sections(resume_json)))
+
+def mentions(text: str, phrase: str) -> bool:
+    """
+    Whether a text contains a phrase as whole words, case-insensitively ("Go" is not in "Google").
+    """
+    phrase = normalize(phrase)
+    return bool(phrase) and re.search(rf"(?<!\w){re.escape(phrase)}(?!\w)", normalize(text)) is not None
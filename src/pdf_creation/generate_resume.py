@@ -3,6 +3,21 @@ import os
 from jinja2 import Environment, FileSystemLoader
 import subprocess
 import argparse
+import hashlib
+import shutil
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+# Add the project root directory to the Python path
+project_root = str(Path(__file__).resolve().parents[2])
+sys.path.append(project_root)
+
+from src.utils.profiling import profiled, span
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / 'resume_templates'
+# Compiled PDFs by hash of the document class and the rendered TeX source, an unchanged resume is not compiled again
+PDF_CACHE_DIR = Path(project_root) / '.cache' / 'pdf'
 
 
 def json_preparation_for_latex(data):
@@ -63,26 +78,13 @@ def json_preparation_for_latex(data):
 
 # test = escape_for_latex(resume_data)
 
-def generate_resume(json_file_path, output_name=None):
+@lru_cache
+def get_jinja_env() -> Environment:
     """
-    This function generates a PDF resume from a JSON data file.
+    The Jinja environment for the LaTeX templates, created once per process so that compiled templates are reused.
     """
-    # Load JSON data
-    with open(json_file_path, 'r') as f:
-        resume_data = json.load(f)
-    
-    # Get the directory path from json_file_path
-    result_dir = os.path.dirname(json_file_path)
-    
-    # Extract last name from contact info and use it for output_name if not provided
-    if output_name is None:
-        full_name = resume_data.get('contact_info', {}).get('name', '')
-        last_name = full_name.split()[-1] if full_name else 'resume'
-        output_name = f'resume_{last_name}'
-    
-    # Set up Jinja environment
-    env = Environment(
-        loader=FileSystemLoader('src/pdf_creation/resume_templates'),
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
         block_start_string='\\BLOCK{',  # Fixed escape sequence
         block_end_string='}',
         variable_start_string='\\VAR{',  # Fixed escape sequence
@@ -94,22 +96,68 @@ def generate_resume(json_file_path, output_name=None):
         trim_blocks=True,
         autoescape=False,
     ) # This environment is used to render the LaTeX template with the JSON data.
+
+def run_pdflatex(tex_name: str, result_dir: str) -> None:
+    """
+    Compile a TeX file in `result_dir`. A second pass only runs if LaTeX asks for it (changed labels or references).
+    The working directory is passed to the subprocess instead of changing the one of this process,
+    so several resumes can be compiled in parallel threads.
+    """
+    base_name = os.path.splitext(tex_name)[0]
+    for _ in range(2):
+        with span("pdflatex"):
+            subprocess.run(['pdflatex', '-interaction=nonstopmode', tex_name], check=True, cwd=result_dir)
+        with open(os.path.join(result_dir, f'{base_name}.log'), 'r', errors='ignore') as log:
+            if 'Rerun to get' not in log.read():
+                return
+
+@profiled("pdf")
+def generate_resume(json_file_path, output_name=None, backend="latex"):
+    """
+    This function generates a PDF resume from a JSON data file and returns the path to the PDF.
+    backend: "latex" compiles resume.tex.jinja with pdflatex (final copies),
+             "reportlab" renders a close layout in-process in milliseconds (previews and batch output).
+    """
+    if backend == "reportlab":
+        from src.pdf_creation.generate_resume_preview import generate_resume_preview
+        return generate_resume_preview(json_file_path, output_name)
+    if backend != "latex":
+        raise ValueError(f"Unsupported PDF backend: {backend}")
+    
+    # Load JSON data
+    with open(json_file_path, 'r') as f:
+        resume_data = json.load(f)
+    
+    # Get the directory path from json_file_path
+    result_dir = os.path.dirname(json_file_path) or '.'
     
-    # Load template
-    template = env.get_template('resume.tex.jinja')
+    # Extract last name from contact info and use it for output_name if not provided
+    if output_name is None:
+        full_name = resume_data.get('contact_info', {}).get('name', '')
+        last_name = full_name.split()[-1] if full_name else 'resume'
+        output_name = f'resume_{last_name}'
     
-    # Render template with data
-    output_tex = template.render(**json_preparation_for_latex(resume_data))
+    with span("jinja_render"):
+        # Load template
+        template = get_jinja_env().get_template('resume.tex.jinja')
+        
+        # Render template with data
+        output_tex = template.render(**json_preparation_for_latex(resume_data))
     
     # Write TEX file
     tex_path = f'{result_dir}/{output_name}.tex' 
     pdf_path = f'{result_dir}/{output_name}.pdf'
     
-    # Copy resume.cls to result directory
-    cls_source = os.path.join('src/pdf_creation/resume_templates', 'resume.cls')
-    cls_dest = os.path.join(result_dir, 'resume.cls')
-    with open(cls_source, 'r') as source, open(cls_dest, 'w') as dest:
-        dest.write(source.read())
+    resume_class = (TEMPLATES_DIR / 'resume.cls').read_bytes()
+    cached_pdf = PDF_CACHE_DIR / f'{hashlib.sha256(resume_class + output_tex.encode()).hexdigest()}.pdf'
+    if cached_pdf.exists():
+        shutil.copyfile(cached_pdf, pdf_path)
+        print(f"PDF generated successfully (cached): {pdf_path}")
+        return pdf_path
+    
+    # Write resume.cls to result directory
+    with open(os.path.join(result_dir, 'resume.cls'), 'wb') as f:
+        f.write(resume_class)
     
     # Write TEX file
     with open(tex_path, 'w') as f:
@@ -117,16 +165,7 @@ def generate_resume(json_file_path, output_name=None):
     
     # Compile TEX to PDF
     try:
-        # Change to result directory before running pdflatex
-        current_dir = os.getcwd()
-        os.chdir(result_dir)
-        
-        # Run pdflatex twice to ensure proper rendering of all elements
-        subprocess.run(['pdflatex', f'{output_name}.tex'], check=True)
-        subprocess.run(['pdflatex', f'{output_name}.tex'], check=True)
-        
-        # Change back to original directory
-        os.chdir(current_dir)
+        run_pdflatex(f'{output_name}.tex', result_dir)
         
         # Clean up auxiliary files
         for ext in ['.aux', '.log', '.out', '.cls', '.tex']:
@@ -134,16 +173,21 @@ def generate_resume(json_file_path, output_name=None):
             if os.path.exists(aux_file):
                 os.remove(aux_file)
         
+        PDF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(pdf_path, cached_pdf)
         print(f"PDF generated successfully: {pdf_path}")
+        return pdf_path
         
     except subprocess.CalledProcessError as e:
         print(f"Error generating PDF: {e}")
-        os.chdir(current_dir)  # Ensure we return to original directory even if error occurs
+        return None
     
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Generate a PDF resume from JSON data')
     parser.add_argument('json_path', help='Path to the JSON resume data file')
     parser.add_argument('--output', '-o', help='Output filename (without extension)')
+    parser.add_argument('--backend', choices=['latex', 'reportlab'], default='latex',
+                      help='latex for the final copy, reportlab for a fast preview (default: latex)')
     
     args = parser.parse_args()
-    generate_resume(args.json_path, args.output)
\ No newline at end of file
+    generate_resume(args.json_path, args.output, backend=args.backend)
\ No newline at end of file
@@ -0,0 +1,192 @@
+import json
+import os
+import argparse
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import (HRFlowable, KeepTogether, ListFlowable, ListItem, Paragraph,
+                                SimpleDocTemplate, Spacer, Table, TableStyle)
+import sys
+from pathlib import Path
+
+# Add the project root directory to the Python path
+project_root = str(Path(__file__).resolve().parents[2])
+sys.path.append(project_root)
+
+from src.utils.profiling import span
+
+# Colors and fonts close to resume.tex.jinja (10pt article, myblue links, gray column rule)
+LINK_COLOR = "#00A4DA"
+FONT = "Times-Roman"
+FONT_BOLD = "Times-Bold"
+
+STYLES = {
+    "name": ParagraphStyle("name", fontName=FONT_BOLD, fontSize=14, leading=18, alignment=TA_CENTER, spaceAfter=6),
+    "address": ParagraphStyle("address", fontName=FONT, fontSize=10, leading=12, alignment=TA_CENTER, spaceAfter=2),
+    "section": ParagraphStyle("section", fontName=FONT_BOLD, fontSize=10, leading=12, spaceBefore=6, spaceAfter=2, keepWithNext=1),
+    "body": ParagraphStyle("body", fontName=FONT, fontSize=10, leading=12),
+    "right": ParagraphStyle("right", fontName=FONT, fontSize=10, leading=12, alignment=TA_RIGHT),
+    "bullet": ParagraphStyle("bullet", fontName=FONT, fontSize=10, leading=11.5),
+}
+
+def text(value) -> str:
+    """
+    Escape a JSON value for reportlab's paragraph markup.
+    """
+    return escape(str(value)) if value else ""
+
+def link(url, label) -> str:
+    if not url:
+        return label
+    return f'<link href="{escape(url, {chr(34): "&quot;"})}" color="{LINK_COLOR}">{label}</link>'
+
+def two_column_row(left: str, right: str, width: float) -> Table:
+    """
+    Left aligned and right aligned text on one line, like `left \\hfill right` in LaTeX.
+    """
+    table = Table([[Paragraph(left, STYLES["body"]), Paragraph(right, STYLES["right"])]],
+                  colWidths=[width * 0.72, width * 0.28])
+    table.setStyle(TableStyle([("LEFTPADDING", (0, 0), (-1, -1), 0), ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+                               ("TOPPADDING", (0, 0), (-1, -1), 0), ("BOTTOMPADDING", (0, 0), (-1, -1), 0)]))
+    return table
+
+def bullets(items) -> ListFlowable:
+    return ListFlowable(
+        [ListItem(Paragraph(text(item), STYLES["bullet"]), leftIndent=12) for item in items],
+        bulletType="bullet", start="•", bulletFontSize=6, leftIndent=12,
+    )
+
+def section(title: str, content: list) -> list:
+    rule = HRFlowable(width="100%", thickness=0.4, color=colors.black, spaceAfter=3)
+    # Keep the section title with its first entry
+    rule.keepWithNext = True
+    return [Paragraph(text(title.upper()), STYLES["section"]), rule] + content
+
+def build_story(resume_data: dict, width: float) -> list:
+    """
+    Lay out a tailored resume in the same order and structure as resume.tex.jinja.
+    """
+    contact_info = resume_data.get("contact_info") or {}
+    media = resume_data.get("media") or {}
+    story = [Paragraph(text(contact_info.get("name", "")).upper(), STYLES["name"])]
+
+    address = []
+    if contact_info.get("email"):
+        address.append(link(f'mailto:{contact_info["email"]}', text(contact_info["email"])))
+    for key in ["github_url", "linkedin_url"]:
+        if media.get(key):
+            address.append(link(media[key], text(media[key])))
+    if address:
+        story.append(Paragraph(" &nbsp;&nbsp; ".join(address), STYLES["address"]))
+    if contact_info.get("location"):
+        story.append(Paragraph(text(contact_info["location"][0]), STYLES["address"]))
+
+    summary = (resume_data.get("summary") or {}).get("summary")
+    if summary:
+        story += section("Summary", [Paragraph(text(summary), STYLES["body"])])
+
+    experiences = (resume_data.get("experiences") or {}).get("work_experience") or []
+    if experiences:
+        content = []
+        for exp in experiences:
+            dates = f'{text(exp.get("from_date"))} - {text(exp.get("to_date"))}' if exp.get("from_date") else ""
+            content.append(KeepTogether([
+                two_column_row(f'<b>{text(exp.get("role"))}</b>', dates, width),
+                two_column_row(f'<i>{text(exp.get("company"))}</i>', f'<i>{text(exp.get("location"))}</i>', width),
+                bullets(exp.get("description") or []),
+                Spacer(1, 3),
+            ]))
+        story += section("Work Experience", content)
+
+    educations = (resume_data.get("educations") or {}).get("education") or []
+    skill_sections = (resume_data.get("skill_sections") or {}).get("skill_section") or []
+    if educations or skill_sections:
+        education_column = [Paragraph("<b>EDUCATION</b>", STYLES["section"])]
+        for edu in educations:
+            education_column += [
+                Paragraph(f'<b>{text(edu.get("degree"))}</b>', STYLES["body"]),
+                Paragraph(f'<i>{text(edu.get("university"))}</i> &nbsp; {text(edu.get("from_date"))} - {text(edu.get("to_date"))}', STYLES["body"]),
+            ]
+            if edu.get("special_achievements"):
+                education_column.append(bullets(edu["special_achievements"]))
+            education_column.append(Spacer(1, 4))
+        skills_column = [Paragraph("<b>SKILLS</b>", STYLES["section"])]
+        for skill_section in skill_sections:
+            skills_column.append(Paragraph(
+                f'<b>{text(skill_section.get("name"))}:</b> {text(", ".join(skill_section.get("skills") or []))}', STYLES["body"]))
+        table = Table([[education_column, skills_column]], colWidths=[width / 2, width / 2])
+        table.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP"), ("LEFTPADDING", (0, 0), (0, 0), 0),
+                                   ("RIGHTPADDING", (0, 0), (0, 0), 8), ("LEFTPADDING", (1, 0), (1, 0), 8),
+                                   ("LINEAFTER", (0, 0), (0, 0), 0.5, colors.gray)]))
+        story += [Spacer(1, 4), table]
+
+    certifications = (resume_data.get("certifications_trainings") or {}).get("certifications_trainings") or []
+    if certifications:
+        content = []
+        for cert in certifications:
+            entry = [
+                two_column_row(link(cert.get("certificate_link"), f'<b>{text(cert.get("name"))}</b>'), text(cert.get("date")), width),
+                Paragraph(f'<i>{text(cert.get("organization"))}</i>', STYLES["body"]),
+            ]
+            if cert.get("description"):
+                entry.append(Paragraph(text(cert["description"]), STYLES["body"]))
+            if cert.get("key_technologies_concepts"):
+                entry.append(Paragraph(f'<b>Technologies:</b> {text(cert["key_technologies_concepts"])}', STYLES["body"]))
+            project = cert.get("project")
+            if project:
+                entry.append(Paragraph(
+                    f'<b>Project:</b> {link(project.get("link"), text(project.get("name")))} - {text(project.get("purpose"))}', STYLES["body"]))
+            content.append(KeepTogether(entry + [Spacer(1, 3)]))
+        story += section("Certifications & Training", content)
+
+    projects = (resume_data.get("projects") or {}).get("projects") or []
+    if projects:
+        content = []
+        for project in projects:
+            entry = [two_column_row(link(project.get("link"), f'<b>{text(project.get("name"))}</b>'), text(project.get("date")), width)]
+            if project.get("purpose"):
+                entry.append(Paragraph(text(project["purpose"]), STYLES["body"]))
+            if project.get("key_technologies_concepts"):
+                entry.append(Paragraph(f'<b>Technologies:</b> {text(project["key_technologies_concepts"])}', STYLES["body"]))
+            content.append(KeepTogether(entry + [Spacer(1, 3)]))
+        story += section("Projects", content)
+
+    return story
+
+def generate_resume_preview(json_file_path, output_name=None):
+    """
+    This function renders a PDF resume from a JSON data file in-process with reportlab.
+    It is much faster than the LaTeX backend and needs no TeX installation, use it for previews and batch output.
+    """
+    with open(json_file_path, 'r') as f:
+        resume_data = json.load(f)
+
+    result_dir = os.path.dirname(json_file_path)
+
+    # Same output name as the LaTeX backend
+    if output_name is None:
+        full_name = resume_data.get('contact_info', {}).get('name', '')
+        last_name = full_name.split()[-1] if full_name else 'resume'
+        output_name = f'resume_{last_name}'
+    pdf_path = os.path.join(result_dir, f'{output_name}.pdf')
+
+    margin = 0.25 * inch
+    doc = SimpleDocTemplate(pdf_path, pagesize=letter, leftMargin=margin, rightMargin=margin,
+                            topMargin=margin, bottomMargin=margin, title=resume_data.get('resume_title', output_name))
+    # The frame keeps a 6pt padding on each side
+    with span("reportlab_build"):
+        doc.build(build_story(resume_data, doc.width - 12))
+
+    print(f"PDF generated successfully: {pdf_path}")
+    return pdf_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Render a preview PDF resume from JSON data without LaTeX')
+    parser.add_argument('json_path', help='Path to the JSON resume data file')
+    parser.add_argument('--output', '-o', help='Output filename (without extension)')
+
+    args = parser.parse_args()
+    generate_resume_preview(args.json_path, args.output)
@@ -1,8 +1,10 @@
 # Purpose of this script is to tailor the resume to the job description using LLM  
-from typing import List, Optional, Literal
+from typing import Annotated, Dict, List, Optional, Literal, Tuple, Type, Union
 from datetime import date
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from pydantic import BaseModel, Field, ValidationError, ValidationInfo, create_model, model_validator
 from dotenv import load_dotenv, find_dotenv
+import copy
 import json
 import os
 import sys
@@ -12,7 +14,11 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 sys.path.append(project_root)
 
 # Change from relative import to absolute import
-from src.utils.llm_factory import LLMFactory
+from src.utils.llm_factory import get_llm_factory
+from src.utils.cascade import CascadePolicy
+from src.utils.profiling import profiled, profiling
+from src.data_extraction.skill_matcher import (extract_skills, format_skill_groups, get_skill_matcher, mentions, resume_text,
+                                               without_contact_sections)
 
 load_dotenv(find_dotenv(usecwd=True))
 
@@ -113,28 +119,242 @@ class Resume(BaseModel):
     assessment: Assessment = Field(description="Assessment of the tailored resume from 1 to 100 and potential areas of improvements including technical skills and experiences")
     
 
-def tailor_resume(resume_path: str, job_description_path: str, provider: str ="anthropic", model: str = "claude-3-5-sonnet-20240620"):
-    client = LLMFactory(provider=provider)
-    if provider == "openai" and not model.startswith("gpt"):
-        raise ValueError("Only OpenAI models starting with gpt are supported.")
-    
-    # extract json from resume and job description
-    resume_json = extract_json(resume_path)
-    job_description_json = extract_json(job_description_path)
-    
-    # Get the directory path from job_description_path
-    result_dir = os.path.dirname(job_description_path)
-    
-    user_prompt = f"""
+# Edit mode: instead of writing out the whole tailored resume, the model returns edit operations against the
+# parsed resume, which are applied locally to a tailored resume copied from it (see base_tailored_resume).
+# Indices are 0-based positions in the parsed resume as given in the prompt, operations do not shift them.
+
+class SetSummary(BaseModel):
+    op: Literal["set_summary"]
+    summary: str = Field(description="The professional summary tailored to the job description.")
+
+class SetRole(BaseModel):
+    op: Literal["set_role"]
+    experience: int = Field(description="Index of the work experience.")
+    role: str = Field(description="The job title tailored to the job description.")
+
+class RewriteBullet(BaseModel):
+    op: Literal["rewrite_bullet"]
+    experience: int = Field(description="Index of the work experience.")
+    bullet: int = Field(description="Index of the bullet point, the number of bullet points adds a new one.")
+    text: str = Field(description="The bullet point in STAR format with quantified results, without invented achievements.")
+
+class SelectBullets(BaseModel):
+    op: Literal["select_bullets"]
+    experience: int = Field(description="Index of the work experience.")
+    bullets: List[int] = Field(description="Indices of the 3 bullet points to keep, in their new order.")
+
+class DescribeProject(BaseModel):
+    op: Literal["describe_project"]
+    project: int = Field(description="Index of the project.")
+    purpose: str = Field(description="What the project does and aims to achieve in 1-2 sentences.")
+    key_technologies_concepts: str = Field(description="Key technologies and concepts of the project tailored to the job description.")
+
+class DescribeCertification(BaseModel):
+    op: Literal["describe_certification"]
+    certification: int = Field(description="Index of the certification or training.")
+    description: str = Field(description="A description of the certification or training tailored to the job description.")
+    key_technologies_concepts: str = Field(description="Key technologies and concepts tailored to the job description.")
+
+class SetSkills(BaseModel):
+    op: Literal["set_skills"]
+    skill_section: int = Field(description="Index of the skill section.")
+    skills: List[str] = Field(description="Skills from the resume, most relevant first, irrelevant ones left out.")
+
+class AddNiceToAdd(BaseModel):
+    op: Literal["add_nice_to_add"]
+    target: Literal["experience", "skill_section"]
+    index: int = Field(description="Index of the work experience or skill section.")
+    items: List[str] = Field(description="Skills, experiences or achievements missing from the resume that would strengthen it.")
+
+class Drop(BaseModel):
+    op: Literal["drop"]
+    target: Literal["experience", "education", "project", "certification", "skill_section"]
+    index: int = Field(description="Index of the item to leave out of the tailored resume.")
+
+EditOperation = Annotated[
+    Union[SetSummary, SetRole, RewriteBullet, SelectBullets, DescribeProject, DescribeCertification, SetSkills, AddNiceToAdd, Drop],
+    Field(discriminator="op"),
+]
+
+class ResumeEdits(BaseModel):
+    resume_title: str = Field(description="Short title starting with company name _ position name.")
+    operations: List[EditOperation] = Field(description="Edit operations turning the resume into the tailored resume, content that stays as it is needs none.")
+    assessment: Assessment = Field(description="Assessment of the tailored resume from 1 to 100 and potential areas of improvements including technical skills and experiences")
+
+    @model_validator(mode="after")
+    def check_operations(self, info: ValidationInfo) -> "ResumeEdits":
+        # With the parsed resume as validation context, operations that cannot be applied are sent back to the model
+        resume_json = (info.context or {}).get("resume_json")
+        if resume_json is not None:
+            apply_resume_edits(base_tailored_resume(resume_json), self)
+        return self
+
+# Bullet points per work experience required by the tailored Experience model
+BULLETS_PER_EXPERIENCE = 3
+
+EDIT_MODE_PROMPT = """
+
+    Do not write out the tailored resume. Return only the edit operations that turn the resume above into the tailored resume,
+    everything without an operation is copied unchanged. Indices are 0-based positions in the resume above, operations do not shift them.
+    Every work experience keeps exactly 3 bullet points: rewrite the ones that need it and choose and order them with select_bullets,
+    without it the first 3 are kept. Keep at most 3 educations, drop the least relevant ones.
+    Order and filter the skills of each skill section with set_skills, skills missing from the resume go into nice_to_add."""
+
+def base_tailored_resume(resume_json: dict) -> dict:
+    """
+    Tailored resume copied from the parsed resume, the starting point of the edit operations.
+    List fields of the parsed resume that are text in the tailored schema are joined, all bullet points are kept until the edits are applied.
+    """
+    def project(project: Optional[dict]) -> Optional[dict]:
+        if not project:
+            return None
+        return {"name": project.get("name"), "date": project.get("date"), "link": project.get("link"), "purpose": None,
+                "key_technologies_concepts": ", ".join(project.get("key_technologies_concepts") or [])}
+
+    contact_info = resume_json.get("contact_info") or {}
+    return {
+        "resume_title": "",
+        "contact_info": {"name": contact_info.get("name"), "email": contact_info.get("email"),
+                         "location": contact_info.get("possible_work_locations")},
+        "summary": {"summary": (resume_json.get("summary") or {}).get("summary", "")},
+        "media": {name: (resume_json.get("media") or {}).get(name) for name in Media.model_fields},
+        "experiences": {"work_experience": [
+            {**{name: experience.get(name) for name in ["role", "company", "location", "from_date", "to_date"]},
+             "description": list(experience.get("description") or []), "nice_to_add": None}
+            for experience in (resume_json.get("experiences") or {}).get("work_experience", [])
+        ]},
+        "educations": {"education": [
+            {name: education.get(name) for name in Education.model_fields}
+            for education in (resume_json.get("educations") or {}).get("education", [])
+        ]},
+        "certifications_trainings": {"certifications_trainings": [
+            {"name": certification.get("name"), "organization": certification.get("organization"), "date": certification.get("date"),
+             "certificate_link": certification.get("link"), "description": None,
+             "key_technologies_concepts": ", ".join(certification.get("key_technologies_concepts") or []),
+             "project": project(certification.get("project")), "information_source": certification.get("information_source")}
+            for certification in (resume_json.get("certifications_trainings") or {}).get("certifications_trainings", [])
+        ]},
+        "projects": {"projects": [project(item) for item in (resume_json.get("projects") or {}).get("projects", [])]},
+        "skill_sections": {"skill_section": [
+            {"name": section.get("name"), "skills": list(section.get("skills") or []), "nice_to_add": None}
+            for section in resume_json.get("skill_sections") or []
+        ]},
+        "assessment": None,
+    }
+
+def apply_resume_edits(base_resume: dict, edits: ResumeEdits) -> dict:
+    """
+    Apply edit operations to a copy of `base_resume` (see base_tailored_resume) and validate the result against the tailored Resume.
+    Raises ValueError for operations that do not fit the resume or a result that is not a valid tailored resume.
+    """
+    resume = copy.deepcopy(base_resume)
+    resume["resume_title"] = edits.resume_title
+    resume["assessment"] = edits.assessment.model_dump()
+    items = {
+        "experience": resume["experiences"]["work_experience"],
+        "education": resume["educations"]["education"],
+        "project": resume["projects"]["projects"],
+        "certification": resume["certifications_trainings"]["certifications_trainings"],
+        "skill_section": resume["skill_sections"]["skill_section"],
+    }
+    matcher = get_skill_matcher()
+    text = resume_text(base_resume)
+    # Skills the resume lists or mentions (per the taxonomy), compared by canonical name so that aliases count
+    resume_skills = {matcher.canonical_name(skill) for section in items["skill_section"] for skill in section["skills"]}
+    resume_skills.update(matcher.find(text))
+
+    def in_resume(skill: str) -> bool:
+        canonical = matcher.canonical_name(skill)
+        if canonical in resume_skills:
+            return True
+        # The taxonomy decides for its own skills ("Swift" in "Swift Logistics" is not the language),
+        # other skills have to appear as whole words and single letters ("R", "C") only count when listed
+        return canonical not in matcher.group_of and len(skill.strip()) > 1 and mentions(text, skill)
+
+    def item(target: str, index: int) -> dict:
+        if not 0 <= index < len(items[target]):
+            raise ValueError(f"{target} {index} does not exist, the resume has {len(items[target])}")
+        return items[target][index]
+
+    selected_bullets = {}
+    dropped = {target: set() for target in items}
+    for operation in edits.operations:
+        if isinstance(operation, SetSummary):
+            resume["summary"]["summary"] = operation.summary
+        elif isinstance(operation, SetRole):
+            item("experience", operation.experience)["role"] = operation.role
+        elif isinstance(operation, RewriteBullet):
+            description = item("experience", operation.experience)["description"]
+            if operation.bullet == len(description):
+                description.append(operation.text)
+            elif 0 <= operation.bullet < len(description):
+                description[operation.bullet] = operation.text
+            else:
+                raise ValueError(f"bullet {operation.bullet} of experience {operation.experience} does not exist, it has {len(description)}")
+        elif isinstance(operation, SelectBullets):
+            description = item("experience", operation.experience)["description"]
+            invalid = [bullet for bullet in operation.bullets if not 0 <= bullet < len(description)]
+            if invalid or len(set(operation.bullets)) != len(operation.bullets):
+                raise ValueError(f"select_bullets of experience {operation.experience} needs distinct bullets out of {len(description)}, got {operation.bullets}")
+            selected_bullets[operation.experience] = operation.bullets
+        elif isinstance(operation, DescribeProject):
+            project = item("project", operation.project)
+            project["purpose"] = operation.purpose
+            project["key_technologies_concepts"] = operation.key_technologies_concepts
+        elif isinstance(operation, DescribeCertification):
+            certification = item("certification", operation.certification)
+            certification["description"] = operation.description
+            certification["key_technologies_concepts"] = operation.key_technologies_concepts
+        elif isinstance(operation, SetSkills):
+            unknown = [skill for skill in operation.skills if not in_resume(skill)]
+            if unknown:
+                raise ValueError(f"skills {', '.join(unknown)} are not in the resume, add them with add_nice_to_add instead")
+            item("skill_section", operation.skill_section)["skills"] = operation.skills
+        elif isinstance(operation, AddNiceToAdd):
+            target = item(operation.target, operation.index)
+            target["nice_to_add"] = (target["nice_to_add"] or []) + operation.items
+        elif isinstance(operation, Drop):
+            item(operation.target, operation.index)
+            dropped[operation.target].add(operation.index)
+
+    for index, experience in enumerate(items["experience"]):
+        bullets = selected_bullets.get(index, range(min(BULLETS_PER_EXPERIENCE, len(experience["description"]))))
+        experience["description"] = [experience["description"][bullet] for bullet in bullets]
+    for target, values in items.items():
+        values[:] = [value for index, value in enumerate(values) if index not in dropped[target]]
+
+    try:
+        return Resume.model_validate(resume).model_dump()
+    except ValidationError as e:
+        raise ValueError(f"The edited resume is not a valid tailored resume: {e}")
+
+# File stored next to tailored_resume.json with the resume and job description it was built from
+TAILORING_SOURCE_FILE = "tailoring_source.json"
+
+# Which tailored sections have to be regenerated when a section of the parsed resume changes.
+# Skills are inferred from the whole resume, so experiences, certifications and projects also affect them.
+SECTION_DEPENDENCIES = {
+    "contact_info": ["contact_info"],
+    "summary": ["summary"],
+    "media": ["media"],
+    "experiences": ["experiences", "summary", "skill_sections"],
+    "educations": ["educations"],
+    "certifications_trainings": ["certifications_trainings", "skill_sections"],
+    "projects": ["projects", "skill_sections"],
+    "skill_sections": ["skill_sections"],
+}
+
+def build_job_description_prompt(job_description_json: dict) -> str:
+    """
+    Build the part of the tailoring prompt that only depends on the job description.
+    It comes first in the prompt, so that requests tailoring different resumes to the same job description
+    share their prefix and the provider can serve it from its prompt cache.
+    """
+    return f"""
     You are an experienced resume expert specializing in Software Engineering and Data Science. 
     Your task is to optimize a candidate's resume for a specific job description, ensuring it passes ATS scans while engaging human readers. 
     Avoid anything that could cause Latex rendering issues like math equations, symbols, etc.
 
-    Here is the candidate's resume:
-    <resume>
-    {resume_json}
-    </resume>
-
     Here is the job description:
     <job_description>
     {job_description_json}
@@ -155,24 +375,253 @@ def tailor_resume(resume_path: str, job_description_path: str, provider: str ="a
     Important: Only use information provided in the original resume. Do not invent or assume any additional details. 
     If there's specific information that might be useful for the job description but is missing from the resume, include it in the "nice_to_add" field.
     Finally provide assessment of the resume from 1 to 100 and potential areas of improvements.
+{build_skill_prompt(extract_skills(json.dumps(job_description_json)), "job description")}"""
 
+def build_skill_prompt(grouped_skills: Dict[str, List[str]], source: str) -> str:
+    """
+    List the skills the local skill taxonomy found in the job description or the resume as candidates: keyword matches
+    the model confirms, ranks for the skill sections and, for missing job skills, picks for "nice_to_add".
+    """
+    if not grouped_skills:
+        return ""
+    if source == "resume":
+        instructions = """Build the skill sections from these groups: keep only the skills the resume really shows (a keyword match can be wrong),
+    put the skills the job description asks for first, leave out the ones that are irrelevant for it,
+    and add skills of the resume that are not listed if they are relevant."""
+    else:
+        instructions = """Skills of the job description that the resume does not mention belong in the "nice_to_add" field of the matching skill section."""
+    return f"""
+    Candidate skills found by a keyword search in the {source}, grouped:
+{format_skill_groups(grouped_skills)}
+    {instructions}
+"""
+
+def build_resume_prompt(resume_json: dict) -> str:
+    """
+    Build the candidate specific part of the tailoring prompt.
+    """
+    return f"""
+    Here is the candidate's resume:
+    <resume>
+    {resume_json}
+    </resume>
+{build_skill_prompt(extract_skills(json.dumps(without_contact_sections(resume_json))), "resume")}
     Begin your analysis now."""
+
+def build_tailoring_prompt(resume_json: dict, job_description_json: dict) -> str:
+    """
+    Build the user prompt asking the model to tailor the whole resume to the job description.
+    """
+    return build_job_description_prompt(job_description_json) + build_resume_prompt(resume_json)
+
+def build_tailoring_messages(resume_json: dict, job_description_json: dict, provider: Optional[str] = None,
+                             extra_prompt: str = "") -> List[dict]:
+    """
+    Build the messages of a tailoring request: the job description prefix followed by the resume (and `extra_prompt`).
+    For Anthropic the prefix is marked as cacheable, so tailoring several resumes to one job description
+    only pays the full input price for the prefix once per cache lifetime. OpenAI caches long prefixes automatically.
+    """
+    prefix = build_job_description_prompt(job_description_json)
+    suffix = build_resume_prompt(resume_json) + extra_prompt
+    if provider != "anthropic":
+        return [{"role": "user", "content": prefix + suffix}]
+    return [{"role": "user", "content": [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": suffix},
+    ]}]
+
+def save_tailored_resume(tailored_resume: dict, result_dir: str, resume_json: dict, job_description_json: dict) -> str:
+    """
+    Save the tailored resume JSON together with the inputs it was tailored from.
+    The inputs are needed by the incremental mode to find out what changed since the last run.
+    """
+    json_path = f'{result_dir}/tailored_resume.json'
+    with open(json_path, 'w') as file:
+        json.dump(tailored_resume, file, indent=2)
     
-    response, completion = client.create_completion(
-        model=model,
-        messages=[
-            # {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        response_model=Resume,
+    with open(f'{result_dir}/{TAILORING_SOURCE_FILE}', 'w') as file:
+        json.dump({"resume": resume_json, "job_description": job_description_json}, file, indent=2)
+    
+    return json_path
+
+def keyword_coverage(tailored_resume: dict, job_description_json: dict) -> float:
+    """
+    Share of the job description keywords that appear in the tailored resume.
+    """
+    keywords = job_description_json.get("keywords") or []
+    if not keywords:
+        return 1.0
+    tailored_text = json.dumps(tailored_resume).lower()
+    return sum(keyword.lower() in tailored_text for keyword in keywords) / len(keywords)
+
+def check_tailoring_thresholds(tailored_resume: dict, job_description_json: dict,
+                               min_score: Optional[int] = None, min_keyword_coverage: Optional[float] = None) -> Optional[str]:
+    """
+    Return the reason why a tailored resume is below the cascade thresholds, or None if it passes.
+    """
+    score = tailored_resume.get("assessment", {}).get("score", 0)
+    if min_score is not None and score < min_score:
+        return f"assessment score {score} below {min_score}"
+    coverage = keyword_coverage(tailored_resume, job_description_json)
+    if min_keyword_coverage is not None and coverage < min_keyword_coverage:
+        return f"keyword coverage {coverage:.2f} below {min_keyword_coverage}"
+    return None
+
+def request_tailoring(messages: List[dict], response_model: Type[BaseModel], provider: str, model: str,
+                      job_description_json: dict, cascade: Optional[dict] = None, base: Optional[dict] = None,
+                      validation_context: Optional[dict] = None) -> BaseModel:
+    """
+    Send a tailoring request either to the given model or through the configured model cascade.
+    With a cascade the response is merged into `base` (the current tailored resume, if any, or the base
+    resume the edit operations apply to) before checking the score and keyword coverage thresholds.
+    `validation_context` is passed to the validators of the response model.
+    """
+    if not cascade:
+        client = get_llm_factory(provider)
+        if provider == "openai" and not model.startswith("gpt"):
+            raise ValueError("Only OpenAI models starting with gpt are supported.")
+        response, completion = client.create_completion(model=model, messages=messages, response_model=response_model,
+                                                        validation_context=validation_context)
+        return response
+    
+    def merged(response: BaseModel) -> dict:
+        if isinstance(response, ResumeEdits):
+            return apply_resume_edits(base, response)
+        return {**(base or {}), **response.model_dump()}
+    
+    policy = CascadePolicy(cascade["tiers"], stage="resume_tailoring")
+    response, completion, tier = policy.create_completion(
+        response_model=response_model,
+        messages=messages,
+        validation_context=validation_context,
+        accept=lambda response: check_tailoring_thresholds(
+            merged(response),
+            job_description_json,
+            min_score=cascade.get("min_score"),
+            min_keyword_coverage=cascade.get("min_keyword_coverage"),
+        ),
     )
+    return response
+
+@profiled("tailor")
+def tailor_resume(resume_path: str, job_description_path: str, provider: str ="anthropic", model: str = "claude-3-5-sonnet-20240620",
+                  cascade: Optional[dict] = None, output_dir: Optional[str] = None, output_mode: str = "full"):
+    """
+    Tailor the parsed resume to the job description and save it next to the job description (or in `output_dir`).
+    If `cascade` is given (see config.yaml), provider and model are ignored and the cascade tiers are used instead.
+    With `output_mode` "edits" the model only returns edit operations against the parsed resume (ResumeEdits),
+    which are applied locally, so the unchanged parts of the resume are not generated again.
+    """
+    # extract json from resume and job description
+    resume_json = extract_json(resume_path)
+    job_description_json = extract_json(job_description_path)
+    
+    # Get the directory path from job_description_path
+    result_dir = output_dir or os.path.dirname(job_description_path)
+    os.makedirs(result_dir, exist_ok=True)
+    
+    # Cascade tiers may mix providers, so the provider specific cache markers are only used without a cascade
+    cache_provider = None if cascade else provider
+    if output_mode == "edits":
+        messages = build_tailoring_messages(resume_json, job_description_json, provider=cache_provider, extra_prompt=EDIT_MODE_PROMPT)
+        base_resume = base_tailored_resume(resume_json)
+        edits = request_tailoring(messages, ResumeEdits, provider, model, job_description_json, cascade=cascade,
+                                  base=base_resume, validation_context={"resume_json": resume_json})
+        tailored_resume = apply_resume_edits(base_resume, edits)
+    else:
+        messages = build_tailoring_messages(resume_json, job_description_json, provider=cache_provider)
+        response = request_tailoring(messages, Resume, provider, model, job_description_json, cascade=cascade)
+        tailored_resume = response.model_dump()
     
     # Save tailored resume JSON
-    json_path = f'{result_dir}/tailored_resume.json'
-    with open(json_path, 'w') as file:
-        json.dump(response.model_dump(), file, indent=2)
+    return save_tailored_resume(tailored_resume, result_dir, resume_json, job_description_json)
+
+def changed_resume_sections(old_resume: dict, new_resume: dict) -> List[str]:
+    """
+    Return the top-level sections of the parsed resume whose content differs between two versions.
+    """
+    sections = set(old_resume) | set(new_resume)
+    return sorted(section for section in sections if old_resume.get(section) != new_resume.get(section))
+
+def sections_to_retailor(changed_sections: List[str]) -> List[str]:
+    """
+    Map changed parsed resume sections to the tailored resume sections that have to be requested again.
+    The assessment always depends on the whole resume, so it is re-requested whenever anything changed.
+    """
+    sections = []
+    for changed in changed_sections:
+        for section in SECTION_DEPENDENCIES.get(changed, []):
+            if section not in sections:
+                sections.append(section)
+    if sections:
+        sections.append("assessment")
+    # Keep the order of the tailored Resume schema
+    return [name for name in Resume.model_fields if name in sections]
+
+@lru_cache
+def partial_resume_model(sections: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Build a response model containing only the given sections of the tailored Resume.
+    """
+    fields = {name: (Resume.model_fields[name].annotation, Resume.model_fields[name]) for name in sections}
+    return create_model("PartialResume", **fields)
+
+@profiled("tailor_incremental")
+def tailor_resume_incremental(resume_path: str, job_description_path: str, provider: str = "anthropic", model: str = "claude-3-5-sonnet-20240620",
+                              cascade: Optional[dict] = None, output_dir: Optional[str] = None, output_mode: str = "full") -> str:
+    """
+    Update an existing tailored resume after the parsed resume changed.
+    Only the tailored sections affected by the change are requested from the LLM, the rest are kept as they are.
+    Falls back to a full tailoring if there is no previous tailoring or the job description changed.
+    """
+    resume_json = extract_json(resume_path)
+    job_description_json = extract_json(job_description_path)
+    result_dir = output_dir or os.path.dirname(job_description_path)
     
-    return json_path
+    tailored_path = f'{result_dir}/tailored_resume.json'
+    source_path = f'{result_dir}/{TAILORING_SOURCE_FILE}'
+    if not (os.path.exists(tailored_path) and os.path.exists(source_path)):
+        return tailor_resume(resume_path, job_description_path, provider=provider, model=model, cascade=cascade,
+                             output_dir=output_dir, output_mode=output_mode)
+    
+    source = extract_json(source_path)
+    if source.get("job_description") != job_description_json:
+        return tailor_resume(resume_path, job_description_path, provider=provider, model=model, cascade=cascade,
+                             output_dir=output_dir, output_mode=output_mode)
+    
+    sections = sections_to_retailor(changed_resume_sections(source.get("resume", {}), resume_json))
+    if not sections:
+        return tailored_path
+    
+    tailored_json = extract_json(tailored_path)
+    extra_prompt = f"""
+
+    The resume was already tailored to this job description before it was updated. Here is the current tailored resume:
+    <tailored_resume>
+    {tailored_json}
+    </tailored_resume>
+
+    Only the following sections are affected by the resume update: {", ".join(sections)}.
+    Provide only these sections, consistent in tone and keywords with the rest of the current tailored resume."""
+    
+    if output_mode == "edits":
+        # Edit operations against the updated parsed resume, only the affected sections of the result are used
+        messages = build_tailoring_messages(resume_json, job_description_json, provider=None if cascade else provider,
+                                            extra_prompt=extra_prompt + EDIT_MODE_PROMPT)
+        base_resume = base_tailored_resume(resume_json)
+        edits = request_tailoring(messages, ResumeEdits, provider, model, job_description_json, cascade=cascade,
+                                  base=base_resume, validation_context={"resume_json": resume_json})
+        edited = apply_resume_edits(base_resume, edits)
+        tailored_json.update({section: edited[section] for section in sections})
+    else:
+        messages = build_tailoring_messages(resume_json, job_description_json, provider=None if cascade else provider,
+                                            extra_prompt=extra_prompt)
+        response = request_tailoring(messages, partial_resume_model(tuple(sections)), provider, model,
+                                     job_description_json, cascade=cascade, base=tailored_json)
+        tailored_json.update(response.model_dump())
+    # Validate the merged result against the full schema before saving
+    merged = Resume.model_validate(tailored_json)
+    return save_tailored_resume(merged.model_dump(), result_dir, resume_json, job_description_json)
 
 if __name__ == "__main__":
     import argparse
@@ -180,21 +629,31 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Tailor resume to job description using LLM')
     parser.add_argument('--resume_path', type=str, required=True,
                       help='Path to the resume JSON file')
-    parser.add_argument('--job_description_path', type=str, required=True,
-                      help='Path to the job description JSON file')
+    parser.add_argument('--job_description_path', type=str, required=True, nargs='+',
+                      help='Path to the job description JSON file (several paths can be given)')
     parser.add_argument('--model', type=str, default='claude-3-5-sonnet-20240620',
                       help='LLM model to use (default: claude-3-5-sonnet-20240620)')
     parser.add_argument('--provider', type=str, default='anthropic',
                       help='LLM provider to use (default: anthropic)')
+    parser.add_argument('--output_mode', choices=['full', 'edits'], default='full',
+                      help='full: the model writes the whole tailored resume, edits: only edit operations applied locally (default: full)')
+    parser.add_argument('--incremental', action='store_true',
+                      help='Only re-tailor the sections affected by changes in the resume')
+    parser.add_argument('--profile', nargs='?', const='spans', choices=['spans', 'cprofile'],
+                      help='Time every stage and write a summary and a flamegraph file to logs/profiles/')
     
     args = parser.parse_args()
     
-    tailor_resume(
-        resume_path=args.resume_path,
-        job_description_path=args.job_description_path,
-        provider=args.provider,
-        model=args.model
-    )
+    tailor = tailor_resume_incremental if args.incremental else tailor_resume
+    with profiling(args.profile, run_name="tailoring"):
+        for job_description_path in args.job_description_path:
+            tailor(
+                resume_path=args.resume_path,
+                job_description_path=job_description_path,
+                provider=args.provider,
+                model=args.model,
+                output_mode=args.output_mode
+            )
 
 
 # python src/tailoring_resume/tailored_resume_json.py \
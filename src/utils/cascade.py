@@ -0,0 +1,70 @@
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel
+from src.utils.llm_factory import get_llm_factory
+from src.utils.metrics import record_metric, usage_tokens
+
+logger = logging.getLogger("resume_builder")
+
+class CascadeTier(BaseModel):
+    provider: str
+    model: str
+
+class CascadePolicy:
+    """
+    Tries the configured tiers from the cheapest to the strongest model and escalates to the next tier
+    only if the request fails (e.g. validation errors after retries) or the response is not accepted.
+    Every attempt is recorded in the metrics log with the tier that served it.
+    """
+    def __init__(self, tiers: List[Dict[str, str]], stage: str):
+        if not tiers:
+            raise ValueError("A cascade needs at least one tier")
+        self.tiers = [CascadeTier(**tier) for tier in tiers]
+        self.stage = stage
+
+    def create_completion(
+        self,
+        response_model: Type[BaseModel],
+        messages: List[Dict[str, str]],
+        accept: Optional[Callable[[BaseModel], Optional[str]]] = None,
+        **kwargs
+    ) -> Tuple[Any, Any, CascadeTier]:
+        """
+        Run the request through the tiers. `accept` returns None if the response is good enough,
+        otherwise the reason for escalating. The response of the last tier is always returned.
+        """
+        for index, tier in enumerate(self.tiers):
+            is_last = index == len(self.tiers) - 1
+            start = time.perf_counter()
+            try:
+                response, completion = get_llm_factory(tier.provider).create_completion(
+                    model=tier.model, response_model=response_model, messages=messages, **kwargs
+                )
+            except Exception as e:
+                self._record(index, tier, start, None, accepted=False, reason=f"{type(e).__name__}: {e}")
+                if is_last:
+                    raise
+                logger.warning(f"Cascade tier {index} ({tier.provider}/{tier.model}) failed, escalating: {e}")
+                continue
+
+            reason = accept(response) if accept else None
+            accepted = reason is None or is_last
+            self._record(index, tier, start, completion, accepted=accepted, reason=reason)
+            if accepted:
+                logger.info(f"Cascade stage {self.stage} served by tier {index} ({tier.provider}/{tier.model})")
+                return response, completion, tier
+            logger.info(f"Cascade tier {index} ({tier.provider}/{tier.model}) not accepted, escalating: {reason}")
+
+    def _record(self, index: int, tier: CascadeTier, start: float, completion: Any, accepted: bool, reason: Optional[str]):
+        record_metric(
+            "cascade",
+            stage=self.stage,
+            tier=index,
+            provider=tier.provider,
+            model=tier.model,
+            latency_s=round(time.perf_counter() - start, 3),
+            accepted=accepted,
+            reason=reason,
+            **usage_tokens(completion),
+        )
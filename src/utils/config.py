@@ -1 +1,18 @@
- 
\ No newline at end of file
+import copy
+import yaml
+from pathlib import Path
+
+# Parsed config files by path, re-read only when the file changes, so a long-running daemon sees edits
+_cache = {}
+
+def load_config(config_path: str = "config.yaml") -> dict:
+    config_path = Path(config_path).resolve()
+    if not config_path.exists():
+        raise FileNotFoundError("config.yaml not found in root directory")
+
+    mtime = config_path.stat().st_mtime
+    if _cache.get(config_path, (None,))[0] != mtime:
+        with open(config_path, "r") as f:
+            _cache[config_path] = (mtime, yaml.safe_load(f))
+    # Callers may modify their copy
+    return copy.deepcopy(_cache[config_path][1])
@@ -6,46 +6,268 @@ project_root = str(Path(__file__).resolve().parents[2])
 sys.path.append(project_root)
 
 import asyncio
-from typing import Type, Any, Dict, List, Tuple
+import copy
+import threading
+import time
+import logging
+from functools import lru_cache
+from typing import Type, Any, Dict, List, Optional, Tuple
 from pydantic import BaseModel
 from src.utils.settings import get_settings
+from src.utils.metrics import record_metric, usage_tokens, latency_tracker
+from src.utils.rate_limit import get_provider_guard
+from src.utils.tokens import estimate_message_tokens, plan_max_tokens
+from src.utils.schema import prepared_response_model, schema_tokens
+from src.utils.profiling import coroutine_with_current_spans, span
 from openai import AsyncOpenAI, OpenAI
 from anthropic import AsyncAnthropic, Anthropic
 from groq import AsyncGroq, Groq
 import instructor
+from json import JSONDecodeError
+from pydantic import ValidationError
+from instructor.retry import InstructorRetryException
+from tenacity import AsyncRetrying, Retrying, retry_if_exception_type, stop_after_attempt
+
+logger = logging.getLogger("resume_builder")
+
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+def run_async(coroutine):
+    """
+    Run a coroutine on a shared background event loop and wait for the result.
+    Async clients are bound to the loop they first ran on, so one long-lived loop lets them keep their connection pools.
+    """
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coroutine_with_current_spans(coroutine), _event_loop).result()
 
 class LLMFactory:
     def __init__(self, provider: str):
         self.provider = provider
         self.settings = getattr(get_settings(), provider)
         self.client = self._initialize_client()
+        self._async_client = None
     
-    def _initialize_client(self):
+    def _initialize_client(self, is_async: bool = False):
         client_map = {
-            "openai": (OpenAI, instructor.from_openai),
-            "anthropic": (Anthropic, instructor.from_anthropic),
-            "groq": (Groq, lambda client: instructor.from_groq(client, mode=instructor.Mode.TOOLS))
+            "openai": (AsyncOpenAI if is_async else OpenAI, instructor.from_openai),
+            "anthropic": (AsyncAnthropic if is_async else Anthropic, instructor.from_anthropic),
+            "groq": (AsyncGroq if is_async else Groq, lambda client: instructor.from_groq(client, mode=instructor.Mode.TOOLS)),
+            # Local OpenAI compatible server (e.g. Ollama), tool calling support varies so JSON mode is used by default
+            "llama": (AsyncOpenAI if is_async else OpenAI, lambda client: instructor.from_openai(client, mode=instructor.Mode[self.settings.mode]))
         }
         
         if self.provider not in client_map:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
         
         ClientClass, wrapper = client_map[self.provider]
-        return wrapper(ClientClass(api_key=self.settings.api_key))
+        # Rate limit and overload retries are handled by the provider guard, not by the SDK
+        client_kwargs = {"api_key": self.settings.api_key, "max_retries": 0}
+        if getattr(self.settings, "base_url", None):
+            client_kwargs["base_url"] = self.settings.base_url
+        return wrapper(ClientClass(**client_kwargs))
     
-    def create_completion(
-        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
-    ) -> Tuple[Any, Any]:
-        completion_params = {
-            "model": kwargs.get("model", self.settings.default_model),
+    @property
+    def async_client(self):
+        # Created lazily, only hedged and batched requests need it
+        if self._async_client is None:
+            self._async_client = self._initialize_client(is_async=True)
+        return self._async_client
+    
+    def _completion_params(self, response_model: Type[BaseModel], messages: List[Dict[str, str]], is_async: bool = False, **kwargs) -> Dict[str, Any]:
+        # instructor retries on any exception by default, which turns rate limit errors into immediate retry storms.
+        # Only invalid responses are retried here, provider errors are left to the provider guard.
+        RetryingClass = AsyncRetrying if is_async else Retrying
+        max_retries = RetryingClass(
+            stop=stop_after_attempt(kwargs.get("max_retries", self.settings.max_retries)),
+            # instructor wraps invalid responses into InstructorRetryException after queueing the reask message
+            retry=retry_if_exception_type((ValidationError, JSONDecodeError, InstructorRetryException)),
+            reraise=True,
+        )
+        compact = kwargs.get("compact_schema", self.settings.compact_schema)
+        model = kwargs.get("model", self.settings.default_model)
+        prepared = prepared_response_model(response_model, compact)
+        # Preflight before any network call: oversized prompts are rejected and max_tokens is sized to the expected response
+        max_tokens = plan_max_tokens(
+            model, estimate_message_tokens(messages, model), schema_tokens(prepared), prepared.model_json_schema(),
+            max_tokens=kwargs.get("max_tokens", self.settings.max_tokens),
+        )
+        return {
+            "model": model,
             "temperature": kwargs.get("temperature", self.settings.temperature),
-            "max_retries": kwargs.get("max_retries", self.settings.max_retries),
-            "max_tokens": kwargs.get("max_tokens", self.settings.max_tokens),
-            "response_model": response_model,
+            "max_retries": max_retries,
+            "max_tokens": max_tokens,
+            "response_model": prepared,
             "messages": messages,
             "stream": kwargs.get("stream", False),  # Add streaming option, default to False    
+            # Passed to the validators of the response model, failed validations are sent back to the model
+            "validation_context": kwargs.get("validation_context"),
         }
-        return self.client.chat.completions.create_with_completion(**completion_params)
+    
+    def _attempt_params(self, completion_params: Dict[str, Any]) -> Dict[str, Any]:
+        # instructor modifies the messages in place (reask messages, the schema in JSON mode), so every attempt,
+        # including retries of the provider guard, starts from a fresh copy and the caller's list is never changed.
+        # Cascade tiers and hedged requests would otherwise inherit failed answers in another provider's format.
+        return {**completion_params, "messages": copy.deepcopy(completion_params["messages"])}
+    
+    def _reserved_tokens(self, completion_params: Dict[str, Any]) -> int:
+        # Providers count the requested max_tokens against the tokens per minute limit
+        return estimate_message_tokens(completion_params["messages"], completion_params["model"]) + completion_params["max_tokens"]
+    
+    def _full_response(self, response_model: Type[BaseModel], response: BaseModel,
+                       validation_context: Optional[Dict[str, Any]] = None) -> BaseModel:
+        # Responses of the compact schema are validated against the full response model
+        if isinstance(response, response_model):
+            return response
+        return response_model.model_validate(response.model_dump(), context=validation_context)
+    
+    def _record_call(self, model: str, start: float, completion: Any, reserved_tokens: int, max_tokens: int) -> None:
+        latency = time.perf_counter() - start
+        tokens = usage_tokens(completion)
+        if tokens["input_tokens"] is not None:
+            get_provider_guard(self.provider).settle(reserved_tokens, tokens["input_tokens"] + (tokens["output_tokens"] or 0))
+        latency_tracker.add(f"{self.provider}/{model}", latency)
+        record_metric("llm_call", provider=self.provider, model=model, latency_s=round(latency, 3), max_tokens=max_tokens, **tokens)
+    
+    def create_completion(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
+    ) -> Tuple[Any, Any]:
+        completion_params = self._completion_params(response_model, messages, **kwargs)
+        reserved_tokens = self._reserved_tokens(completion_params)
+        start = time.perf_counter()
+        with span("llm_call"):
+            response, completion = get_provider_guard(self.provider).call(
+                lambda: self.client.chat.completions.create_with_completion(**self._attempt_params(completion_params)), reserved_tokens
+            )
+        self._record_call(completion_params["model"], start, completion, reserved_tokens, completion_params["max_tokens"])
+        with span("response_validation"):
+            return self._full_response(response_model, response, completion_params["validation_context"]), completion
+    
+    async def acreate_completion(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
+    ) -> Tuple[Any, Any]:
+        completion_params = self._completion_params(response_model, messages, is_async=True, **kwargs)
+        reserved_tokens = self._reserved_tokens(completion_params)
+        start = time.perf_counter()
+        with span("llm_call"):
+            response, completion = await get_provider_guard(self.provider).acall(
+                lambda: self.async_client.chat.completions.create_with_completion(**self._attempt_params(completion_params)), reserved_tokens
+            )
+        self._record_call(completion_params["model"], start, completion, reserved_tokens, completion_params["max_tokens"])
+        with span("response_validation"):
+            return self._full_response(response_model, response, completion_params["validation_context"]), completion
+    
+    def create_completion_batch(
+        self, requests: List[Dict[str, Any]], return_exceptions: bool = False, **kwargs
+    ) -> List[Any]:
+        """
+        Run several completions concurrently. Each request is a dict with `response_model`, `messages`
+        and optionally its own completion kwargs, `kwargs` apply to all of them.
+        At most `max_concurrency` requests are in flight at once, for a local server this keeps its
+        parallel slots busy so it can batch the requests together.
+        Returns the (response, completion) tuples in the order of the requests.
+        """
+        with span("llm_batch"):
+            return run_async(self._create_completion_batch(requests, return_exceptions, **kwargs))
+    
+    async def _create_completion_batch(
+        self, requests: List[Dict[str, Any]], return_exceptions: bool, **kwargs
+    ) -> List[Any]:
+        semaphore = asyncio.Semaphore(self.settings.max_concurrency)
+        
+        async def run(request: Dict[str, Any]):
+            async with semaphore:
+                return await self.acreate_completion(**{**kwargs, **request})
+        
+        return await asyncio.gather(*(run(request) for request in requests), return_exceptions=return_exceptions)
+    
+    def hedge_deadline(self, model: str, hedge: Dict[str, Any]) -> float:
+        """
+        Seconds to wait for the primary provider before sending the backup request:
+        the p95 latency of the primary model once enough calls were recorded, otherwise the configured default.
+        """
+        key = f"{self.provider}/{model}"
+        if latency_tracker.count(key) >= hedge.get("min_samples", 10):
+            return latency_tracker.percentile(key, 0.95)
+        return hedge.get("deadline", 20.0)
+    
+    def create_completion_hedged(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], hedge: Dict[str, Any], stage: str, **kwargs
+    ) -> Tuple[Any, Any]:
+        """
+        Send the request to this provider and, if it has not answered by the deadline (or failed),
+        also to the backup provider/model given in `hedge`. The first schema-valid response wins
+        and the other request is cancelled.
+        """
+        with span("llm_hedged"):
+            return run_async(self._create_completion_hedged(response_model, messages, hedge, stage, **kwargs))
+    
+    async def _create_completion_hedged(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], hedge: Dict[str, Any], stage: str, **kwargs
+    ) -> Tuple[Any, Any]:
+        model = kwargs.get("model", self.settings.default_model)
+        deadline = self.hedge_deadline(model, hedge)
+        start = time.perf_counter()
+        
+        # Both requests copy the messages (see _attempt_params), so reasks of one never reach the other provider
+        primary = asyncio.create_task(self.acreate_completion(response_model, messages, **kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=deadline)
+        if primary in done and primary.exception() is None:
+            self._record_hedge(stage, model, hedge, deadline, start, hedged=False, winner="primary")
+            return primary.result()
+        
+        backup_kwargs = {**kwargs, "model": hedge["model"]}
+        backup = asyncio.create_task(get_llm_factory(hedge["provider"]).acreate_completion(response_model, messages, **backup_kwargs))
+        tasks = {backup: "backup"} if primary in done else {primary: "primary", backup: "backup"}
+        
+        errors = [primary.exception()] if primary in done else []
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in done if task.exception() is None), None)
+            errors.extend(task.exception() for task in done if task.exception() is not None)
+            if winner is not None:
+                for task in pending:
+                    task.cancel()
+                self._record_hedge(stage, model, hedge, deadline, start, hedged=True, winner=tasks[winner],
+                                   primary_outstanding=primary in pending)
+                return winner.result()
+        raise errors[-1]
+    
+    def _record_hedge(self, stage: str, model: str, hedge: Dict[str, Any], deadline: float, start: float,
+                      hedged: bool, winner: str, primary_outstanding: bool = False) -> None:
+        latency = time.perf_counter() - start
+        latency_saved = None
+        if hedged:
+            # The cancelled primary call never finished, so estimate what waiting for it would have cost from its tail latency
+            tail = latency_tracker.percentile(f"{self.provider}/{model}", 0.99) if primary_outstanding else None
+            latency_saved = round(max(0.0, tail - latency), 3) if tail is not None else None
+        record_metric(
+            "hedge",
+            stage=stage,
+            provider=self.provider,
+            model=model,
+            backup_provider=hedge["provider"],
+            backup_model=hedge["model"],
+            hedged=hedged,
+            winner=winner,
+            deadline_s=round(deadline, 3),
+            latency_s=round(latency, 3),
+            latency_saved_s=latency_saved,
+        )
+        if hedged:
+            logger.info(f"Hedged {stage} request after {deadline:.1f}s, {winner} provider won")
+
+@lru_cache
+def get_llm_factory(provider: str) -> LLMFactory:
+    """
+    Shared LLMFactory per provider, so its clients and connection pools are reused.
+    """
+    return LLMFactory(provider=provider)
 
 # class AsyncLLMFactory:
 #     def __init__(self, provider: str, sem_number: int = 2):
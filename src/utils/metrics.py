@@ -0,0 +1,135 @@
+import json
+import sys
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the project root directory to the Python path
+project_root = str(Path(__file__).resolve().parents[2])
+sys.path.append(project_root)
+
+METRICS_PATH = Path("logs") / "metrics.jsonl"
+
+_lock = threading.Lock()
+
+def record_metric(event: str, **fields: Any) -> None:
+    """
+    Append a metric event as one JSON line to logs/metrics.jsonl.
+    """
+    entry = {"timestamp": datetime.now().isoformat(), "event": event, **fields}
+    with _lock:
+        METRICS_PATH.parent.mkdir(exist_ok=True)
+        with open(METRICS_PATH, "a") as file:
+            file.write(json.dumps(entry, default=str) + "\n")
+
+def load_metrics(event: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Load the recorded metric events, optionally only the ones of a given type.
+    """
+    if not METRICS_PATH.exists():
+        return []
+    entries = []
+    with open(METRICS_PATH, "r") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if event is None or entry.get("event") == event:
+                entries.append(entry)
+    return entries
+
+def usage_tokens(completion: Any) -> Dict[str, Optional[int]]:
+    """
+    Read input and output token usage from an OpenAI or Anthropic style completion.
+    `cached_input_tokens` are the input tokens served from the provider's prompt cache.
+    """
+    usage = getattr(completion, "usage", None)
+    input_tokens = getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", None)
+    output_tokens = getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", None)
+    # Anthropic reports cache reads next to input_tokens, OpenAI as a part of prompt_tokens
+    cached_input_tokens = getattr(usage, "cache_read_input_tokens", None)
+    if cached_input_tokens is None:
+        cached_input_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "cached_input_tokens": cached_input_tokens}
+
+class LatencyTracker:
+    """
+    Keeps the most recent call latencies per provider/model, seeded from the recorded llm_call metrics,
+    so that latency percentiles survive between runs.
+    """
+    def __init__(self, window: int = 200):
+        self.window = window
+        self.samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def _samples(self, key: str) -> deque:
+        if key not in self.samples:
+            history = [entry["latency_s"] for entry in load_metrics("llm_call")
+                       if f'{entry.get("provider")}/{entry.get("model")}' == key and entry.get("latency_s") is not None]
+            self.samples[key] = deque(history, maxlen=self.window)
+        return self.samples[key]
+
+    def add(self, key: str, latency: float) -> None:
+        with self._lock:
+            self._samples(key).append(latency)
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._samples(key))
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples(key))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+latency_tracker = LatencyTracker()
+
+def summarize_metrics(event: str, group_by: List[str]) -> List[Dict[str, Any]]:
+    """
+    Aggregate count, mean latency and token usage of an event grouped by the given fields.
+    """
+    groups = defaultdict(list)
+    for entry in load_metrics(event):
+        groups[tuple(entry.get(field) for field in group_by)].append(entry)
+
+    summary = []
+    for key, entries in groups.items():
+        latencies = [entry["latency_s"] for entry in entries if entry.get("latency_s") is not None]
+        summary.append({
+            **dict(zip(group_by, key)),
+            "count": len(entries),
+            "mean_latency_s": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "input_tokens": sum(entry.get("input_tokens") or 0 for entry in entries),
+            "output_tokens": sum(entry.get("output_tokens") or 0 for entry in entries),
+            "cached_input_tokens": sum(entry.get("cached_input_tokens") or 0 for entry in entries),
+        })
+        saved = [entry["latency_saved_s"] for entry in entries if entry.get("latency_saved_s") is not None]
+        if saved:
+            summary[-1]["latency_saved_s"] = round(sum(saved), 2)
+    return summary
+
+if __name__ == "__main__":
+    import argparse
+    from rich.console import Console
+    from rich.table import Table
+
+    parser = argparse.ArgumentParser(description='Summarize the recorded LLM metrics')
+    parser.add_argument('event', help='Event type to summarize, e.g. cascade')
+    parser.add_argument('--group_by', nargs='+', default=['stage', 'tier', 'provider', 'model'],
+                      help='Fields to group the events by')
+
+    args = parser.parse_args()
+
+    rows = summarize_metrics(args.event, args.group_by)
+    columns = list(dict.fromkeys(key for row in rows for key in row)) or args.group_by
+    table = Table(title=f"{args.event} metrics")
+    for column in columns:
+        table.add_column(str(column))
+    for row in rows:
+        table.add_row(*[str(row.get(column, "")) for column in columns])
+    Console().print(table)
@@ -0,0 +1,180 @@
+import contextvars
+import cProfile
+import functools
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("resume_builder")
+
+PROFILES_DIR = Path("logs") / "profiles"
+
+# Names of the spans enclosing the current code, per thread and per asyncio task
+_span_stack: contextvars.ContextVar[Tuple[str, ...]] = contextvars.ContextVar("span_stack", default=())
+
+class Profiler:
+    """
+    Collects the spans of one run and optionally a cProfile capture of the main thread.
+    Work handed to other threads keeps the enclosing spans with `with_current_spans`,
+    so parallel children can add up to more than their parent span.
+    """
+    def __init__(self, run_name: str, cprofile: bool = False):
+        self.run_name = run_name
+        self.spans: List[Dict[str, Any]] = []
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.start = time.perf_counter()
+        self.wall_s: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, path: Tuple[str, ...], start: float, duration: float) -> None:
+        with self._lock:
+            self.spans.append({"path": list(path), "start_s": round(start - self.start, 6), "duration_s": duration,
+                               "thread": threading.current_thread().name})
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Count, total, mean and max duration per span name, slowest first.
+        """
+        durations = defaultdict(list)
+        for span in self.spans:
+            durations[span["path"][-1]].append(span["duration_s"])
+        rows = [
+            {
+                "span": name,
+                "count": len(values),
+                "total_s": round(sum(values), 3),
+                "mean_s": round(sum(values) / len(values), 3),
+                "max_s": round(max(values), 3),
+                "share_of_run": f"{sum(values) / self.wall_s:.0%}" if self.wall_s else "",
+            }
+            for name, values in durations.items()
+        ]
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def collapsed_stacks(self) -> List[str]:
+        """
+        Span stacks in the collapsed format of flamegraph.pl, speedscope and inferno
+        ("outer;inner <self time in ms>"), the self time being the span time not spent in child spans.
+        """
+        self_time = defaultdict(float)
+        for span in self.spans:
+            self_time[";".join(span["path"])] += span["duration_s"]
+            if len(span["path"]) > 1:
+                self_time[";".join(span["path"][:-1])] -= span["duration_s"]
+        return [f"{stack} {max(0, round(seconds * 1000))}" for stack, seconds in self_time.items()]
+
+    def write(self) -> Path:
+        """
+        Write spans.json, stacks.collapsed and profile.pstats (with cProfile) to logs/profiles/<run>_<timestamp>/.
+        """
+        run_dir = PROFILES_DIR / f'{self.run_name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+        run_dir.mkdir(parents=True, exist_ok=True)
+        with open(run_dir / "spans.json", "w") as file:
+            json.dump({"run": self.run_name, "wall_s": self.wall_s, "spans": self.spans}, file, indent=2)
+        with open(run_dir / "stacks.collapsed", "w") as file:
+            file.write("\n".join(self.collapsed_stacks()) + "\n")
+        if self.cprofile:
+            self.cprofile.dump_stats(run_dir / "profile.pstats")
+        return run_dir
+
+_profiler: Optional[Profiler] = None
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Time the enclosed code as a named span of the running profile, does nothing when not profiling.
+    """
+    profiler = _profiler
+    if profiler is None:
+        yield
+        return
+    path = _span_stack.get() + (name,)
+    token = _span_stack.set(path)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add(path, start, time.perf_counter() - start)
+        _span_stack.reset(token)
+
+def with_current_spans(function):
+    """
+    Wrap a function submitted to a worker thread, so that its spans nest under the spans of the submitting code.
+    """
+    stack = _span_stack.get()
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        token = _span_stack.set(stack)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _span_stack.reset(token)
+    return wrapper
+
+async def _run_in_spans(coroutine: Awaitable, stack: Tuple[str, ...]) -> Any:
+    # Runs as its own task, setting the context variable does not leak to other tasks
+    _span_stack.set(stack)
+    return await coroutine
+
+def coroutine_with_current_spans(coroutine: Awaitable) -> Awaitable:
+    """
+    Wrap a coroutine scheduled on another thread's event loop, so that its spans nest under the current spans.
+    """
+    return _run_in_spans(coroutine, _span_stack.get())
+
+def profiled(name: str):
+    """
+    Decorator timing every call of a function as a span.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def print_profile_summary(profiler: Profiler) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title=f"Profile of {profiler.run_name} ({profiler.wall_s:.2f}s wall time)")
+    rows = profiler.summary()
+    for column in ["span", "count", "total_s", "mean_s", "max_s", "share_of_run"]:
+        table.add_column(column)
+    for row in rows:
+        table.add_row(*[str(value) for value in row.values()])
+    Console().print(table)
+
+@contextmanager
+def profiling(mode: Optional[str], run_name: str) -> Iterator[Optional[Profiler]]:
+    """
+    Profile the enclosed run. mode None disables profiling, "spans" times the named spans and
+    "cprofile" additionally captures a cProfile of the main thread (open profile.pstats with snakeviz or pstats).
+    The summary table is printed and the files are written when the run ends, also if it failed.
+    """
+    global _profiler
+    if not mode:
+        yield None
+        return
+    profiler = Profiler(run_name, cprofile=mode == "cprofile")
+    _profiler = profiler
+    if profiler.cprofile:
+        profiler.cprofile.enable()
+    try:
+        with span(run_name):
+            yield profiler
+    finally:
+        if profiler.cprofile:
+            profiler.cprofile.disable()
+        _profiler = None
+        profiler.wall_s = time.perf_counter() - profiler.start
+        print_profile_summary(profiler)
+        run_dir = profiler.write()
+        logger.info(f"Profile written to {run_dir} (flamegraph: flamegraph.pl {run_dir / 'stacks.collapsed'} > flame.svg)")
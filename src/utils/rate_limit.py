@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Optional
+from src.utils.settings import get_settings
+from src.utils.metrics import record_metric
+
+logger = logging.getLogger("resume_builder")
+
+# HTTP status codes worth retrying: timeouts, conflicts, rate limits, server errors and Anthropic's "overloaded"
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError"}
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` tokens per minute.
+    Reservations may take the bucket below zero, callers then wait until the deficit is refilled,
+    which queues concurrent callers fairly instead of letting them race.
+    """
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take `amount` tokens and return the number of seconds to wait before using them.
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """
+        Give back tokens that were reserved but not used (negative to charge extra usage).
+        """
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for `cooldown` seconds.
+    After the cooldown a single trial call is let through, its result closes or re-opens the circuit.
+    """
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self, provider: str) -> None:
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_running:
+                raise CircuitOpenError(f"Circuit breaker for {provider} is open after {self.failures} consecutive failures")
+            self.trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self) -> bool:
+        """
+        Count a failure, returns True if this failure opened the circuit.
+        """
+        with self._lock:
+            self.failures += 1
+            was_open = self.opened_at is not None
+            if self.failures >= self.threshold or self.trial_running:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+            return self.opened_at is not None and not was_open
+
+def _find_status_error(error: BaseException) -> Optional[BaseException]:
+    # Provider errors may arrive wrapped (e.g. in instructor's retry exception), walk the cause chain
+    while error is not None:
+        if getattr(error, "status_code", None) is not None or type(error).__name__ in RETRYABLE_ERRORS:
+            return error
+        error = error.__cause__ or error.__context__
+    return None
+
+def is_retryable(error: BaseException) -> bool:
+    error = _find_status_error(error)
+    if error is None:
+        return False
+    return type(error).__name__ in RETRYABLE_ERRORS or error.status_code in RETRYABLE_STATUS_CODES
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Read the delay requested by the provider from the retry-after-ms or retry-after response headers.
+    """
+    error = _find_status_error(error)
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+class ProviderGuard:
+    """
+    Rate limiting, backoff and circuit breaking shared by all requests to one provider in this process.
+    """
+    def __init__(self, provider: str):
+        settings = getattr(get_settings(), provider)
+        self.provider = provider
+        self.settings = settings
+        self.request_bucket = TokenBucket(settings.requests_per_minute) if settings.requests_per_minute else None
+        self.token_bucket = TokenBucket(settings.tokens_per_minute) if settings.tokens_per_minute else None
+        self.breaker = CircuitBreaker(settings.circuit_breaker_threshold, settings.circuit_breaker_cooldown)
+        self.paused_until = 0.0
+
+    def _acquire(self, tokens: int) -> float:
+        self.breaker.before_call(self.provider)
+        wait = max(0.0, self.paused_until - time.monotonic())
+        if self.request_bucket:
+            wait = max(wait, self.request_bucket.reserve(1))
+        if self.token_bucket:
+            wait = max(wait, self.token_bucket.reserve(tokens))
+        return wait
+
+    def release(self, tokens: int) -> None:
+        """
+        Give back the tokens reserved for an attempt the provider rejected (e.g. 429), the retry reserves them again.
+        """
+        if self.token_bucket:
+            self.token_bucket.refund(tokens)
+
+    def settle(self, reserved_tokens: int, used_tokens: Optional[int]) -> None:
+        """
+        Correct the token bucket with the actual usage reported by the provider.
+        """
+        if self.token_bucket and used_tokens is not None:
+            self.token_bucket.refund(reserved_tokens - used_tokens)
+
+    def _backoff(self, error: BaseException, attempt: int) -> Optional[float]:
+        """
+        Record a failed attempt and return how long to wait before retrying, or None to give up.
+        """
+        if not is_retryable(error):
+            # The provider answered (e.g. a bad request or invalid output), so it is healthy
+            self.breaker.record_success()
+            return None
+        if self.breaker.record_failure():
+            logger.warning(f"Circuit breaker for {self.provider} opened for {self.settings.circuit_breaker_cooldown}s")
+            record_metric("circuit_open", provider=self.provider, error=type(error).__name__)
+        if attempt >= self.settings.rate_limit_retries:
+            return None
+
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        delay = random.uniform(0, min(self.settings.backoff_max, self.settings.backoff_base * 2 ** attempt))
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = retry_after * random.uniform(1.0, 1.2)
+            # Everyone sending to this provider has to respect the requested pause, not only this request
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        record_metric("retry", provider=self.provider, attempt=attempt, error=type(error).__name__, delay_s=round(delay, 3))
+        logger.warning(f"{self.provider} request failed with {type(error).__name__}, retrying in {delay:.1f}s")
+        return delay
+
+    def call(self, request: Callable[[], Any], tokens: int) -> Any:
+        attempt = 0
+        while True:
+            time.sleep(self._acquire(tokens))
+            try:
+                result = request()
+            except Exception as e:
+                if is_retryable(e):
+                    self.release(tokens)
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, request: Callable[[], Awaitable[Any]], tokens: int) -> Any:
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._acquire(tokens))
+            try:
+                result = await request()
+            except Exception as e:
+                if is_retryable(e):
+                    self.release(tokens)
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+@lru_cache
+def get_provider_guard(provider: str) -> ProviderGuard:
+    return ProviderGuard(provider)
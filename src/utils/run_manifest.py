@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, PrivateAttr
+
+logger = logging.getLogger("resume_builder")
+
+RUNS_DIR = Path("runs")
+
+class StageRecord(BaseModel):
+    status: Literal["done", "failed"]
+    inputs: List[str] = Field(default_factory=list)
+    inputs_hash: str
+    outputs: List[str] = Field(default_factory=list)
+    error: Optional[str] = None
+    finished_at: str
+
+class RunManifest(BaseModel):
+    """
+    What a batch run has finished so far: for every job (the job description, each candidate)
+    the stages with the hash of their inputs and the paths of their outputs.
+    The manifest is rewritten atomically after every stage, so a crashed run can be resumed with
+    only the failed or missing stages redone.
+    """
+    path: str
+    created_at: str = Field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    arguments: Dict[str, Any] = Field(default_factory=dict)
+    jobs: Dict[str, Dict[str, StageRecord]] = Field(default_factory=dict)
+    # Stages of different candidates finish concurrently
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def create(cls, arguments: Dict[str, Any]) -> "RunManifest":
+        path = RUNS_DIR / f'run_{datetime.now().strftime("%Y%m%d_%H%M%S_%f")}.json'
+        manifest = cls(path=str(path), arguments=arguments)
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "RunManifest":
+        """
+        Load a manifest, by default the one of the most recent run.
+        """
+        if path is None:
+            runs = sorted(RUNS_DIR.glob("run_*.json"), key=os.path.getmtime)
+            if not runs:
+                raise FileNotFoundError(f"No run manifest found in {RUNS_DIR}/")
+            path = str(runs[-1])
+        with open(path, "r") as file:
+            return cls.model_validate({**json.load(file), "path": path})
+
+    def save(self) -> None:
+        # Write to a temporary file and rename it, a crash never leaves a truncated manifest behind
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as file:
+            file.write(self.model_dump_json(indent=2))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(file.name, self.path)
+
+    def is_done(self, job: str, stage: str, inputs_hash: str) -> bool:
+        """
+        A stage can be skipped if it succeeded with the same inputs and all its outputs still exist.
+        """
+        record = self.jobs.get(job, {}).get(stage)
+        return (record is not None and record.status == "done" and record.inputs_hash == inputs_hash
+                and all(os.path.exists(output) for output in record.outputs))
+
+    def record(self, job: str, stage: str, inputs: List[str], inputs_hash: str,
+               outputs: Optional[List[str]] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.jobs.setdefault(job, {})[stage] = StageRecord(
+                status="failed" if error else "done", inputs=inputs, inputs_hash=inputs_hash,
+                outputs=outputs or [], error=error, finished_at=datetime.now().isoformat(timespec="seconds"),
+            )
+            self.save()
+
+    def outputs(self, job: str, stage: str) -> List[str]:
+        record = self.jobs.get(job, {}).get(stage)
+        return record.outputs if record else []
+
+def hash_inputs(inputs: List[str], params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Hash the content of the input files together with the stage parameters (provider, model, ...).
+    """
+    digest = hashlib.sha256(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    for path in inputs:
+        with open(path, "rb") as file:
+            digest.update(hashlib.sha256(file.read()).digest())
+    return digest.hexdigest()
+
+def run_stage(manifest: Optional[RunManifest], job: str, stage: str, inputs: List[str],
+              run: Callable[[], Optional[str]], params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Run a stage producing one output file, or return its recorded output if it is already done.
+    Failures are recorded in the manifest and raised again.
+    """
+    if manifest is None:
+        return run()
+    inputs_hash = hash_inputs(inputs, params)
+    if manifest.is_done(job, stage, inputs_hash):
+        logger.info(f"Skipping {stage} of {job}, inputs unchanged since the last run")
+        return manifest.outputs(job, stage)[0]
+    try:
+        output = run()
+    except Exception as e:
+        manifest.record(job, stage, inputs, inputs_hash, error=str(e))
+        raise
+    manifest.record(job, stage, inputs, inputs_hash, outputs=[output] if output else [],
+                    error=None if output else "no output produced")
+    return output
@@ -0,0 +1,138 @@
+import copy
+import json
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type, Union, get_args, get_origin
+from pydantic import BaseModel, ConfigDict, create_model
+import instructor
+from instructor.function_calls import OpenAISchema
+
+# Add the project root directory to the Python path
+project_root = str(Path(__file__).resolve().parents[2])
+sys.path.append(project_root)
+
+from src.utils.metrics import record_metric
+from src.utils.tokens import estimate_tokens
+
+# Maximal length of a field description in the compact schema
+COMPACT_DESCRIPTION_CHARS = 60
+
+def shorten_description(description: str, max_chars: int = COMPACT_DESCRIPTION_CHARS) -> str:
+    """
+    Keep the first sentence of a field description, without examples, cut to `max_chars`.
+    """
+    text = " ".join(description.split())
+    text = re.split(r"(?<=[a-z)])\. |\s(?:e\.g\.|eg\.|such as|For example)", text, maxsplit=1)[0].rstrip(" .,:")
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(" ", 1)[0]
+    return text
+
+def _strip_titles(schema: Dict[str, Any], model: Type[BaseModel]) -> None:
+    # Property titles are derived from the field names and add nothing for the model
+    for property_schema in schema.get("properties", {}).values():
+        property_schema.pop("title", None)
+
+def _compact_annotation(annotation: Any) -> Any:
+    # Replace nested models, also inside Optional[...] and List[...], by their compact versions
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return compact_model(annotation)
+    args = get_args(annotation)
+    if not args:
+        return annotation
+    new_args = tuple(_compact_annotation(arg) for arg in args)
+    if new_args == args:
+        return annotation
+    if get_origin(annotation) is Union:
+        return Union[new_args]
+    return get_origin(annotation)[new_args]
+
+@lru_cache(maxsize=None)
+def compact_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Copy of a response model with shortened field descriptions and without the docstring and property titles.
+    Types and constraints are unchanged, so a response of the compact model validates against the full one.
+    It subclasses the model, so its validators (e.g. checks that make instructor reask) still run.
+    """
+    annotations, fields = {}, {}
+    for name, field in model.model_fields.items():
+        compact_field = copy.copy(field)
+        if field.description:
+            compact_field.description = shorten_description(field.description)
+        annotations[name] = _compact_annotation(field.annotation)
+        fields[name] = compact_field
+    namespace = {
+        "__module__": model.__module__,
+        "__doc__": None,
+        "__annotations__": annotations,
+        "model_config": ConfigDict(json_schema_extra=_strip_titles),
+        **fields,
+    }
+    return type(model)(model.__name__, (model,), namespace)
+
+@lru_cache(maxsize=None)
+def partial_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Copy of a response model whose top-level fields are optional, for documents parsed in parts.
+    """
+    fields = {}
+    for name, field in model.model_fields.items():
+        optional_field = copy.copy(field)
+        optional_field.default = None
+        fields[name] = (Optional[field.annotation], optional_field)
+    return create_model(f"Partial{model.__name__}", __doc__=model.__doc__, **fields)
+
+@lru_cache(maxsize=None)
+def prepared_response_model(model: Type[BaseModel], compact: bool = False) -> Type[BaseModel]:
+    """
+    Response model to pass to instructor, derived once per process.
+    instructor wraps plain pydantic models into a new schema class on every call and regenerates the
+    JSON schema on every access, so the wrapped class and its schemas are built and cached here instead.
+    """
+    prepared = instructor.openai_schema(compact_model(model) if compact else model)
+
+    json_schema = prepared.model_json_schema()
+    # instructor modifies the returned schema, so hand out copies
+    prepared.model_json_schema = staticmethod(lambda *args, **kwargs: copy.deepcopy(json_schema))
+    prepared.openai_schema = prepared.openai_schema
+    prepared.anthropic_schema = prepared.anthropic_schema
+
+    record_metric("schema_size", model=model.__name__, compact=compact, tokens=schema_tokens(prepared))
+    return prepared
+
+@lru_cache(maxsize=None)
+def schema_tokens(model: Type[BaseModel]) -> int:
+    """
+    Estimated number of input tokens the tool schema of a response model adds to every request.
+    """
+    if not issubclass(model, OpenAISchema):
+        model = instructor.openai_schema(model)
+    return estimate_tokens(json.dumps(model.openai_schema))
+
+def schema_size_report(models: List[Type[BaseModel]]) -> List[Dict[str, Any]]:
+    """
+    Estimated schema tokens of the full and the compact version of each response model.
+    """
+    return [
+        {
+            "model": f"{model.__module__.rsplit('.', 1)[-1]}.{model.__name__}",
+            "full_tokens": schema_tokens(model),
+            "compact_tokens": schema_tokens(compact_model(model)),
+        }
+        for model in models
+    ]
+
+if __name__ == "__main__":
+    from rich.console import Console
+    from rich.table import Table
+    from src.data_extraction.data_extraction_job_description import JobDescription
+    from src.data_extraction.data_extraction_resume import Resume as ParsedResume
+    from src.tailoring_resume.tailored_resume_json import Resume as TailoredResume
+
+    table = Table(title="Response model schema size (estimated tokens per request)")
+    for column in ["model", "full_tokens", "compact_tokens"]:
+        table.add_column(column)
+    for row in schema_size_report([JobDescription, ParsedResume, TailoredResume]):
+        table.add_row(*[str(value) for value in row.values()])
+    Console().print(table)
@@ -8,8 +8,23 @@ load_dotenv(find_dotenv(usecwd=True))
 
 class LLMProviderSettings(BaseSettings):
     temperature: float = 0.0
+    # None sizes max_tokens per request from the prompt and the response model (see src/utils/tokens.py)
     max_tokens: Optional[int] = None
-    max_retries: int = 2
+    max_retries: int = 2  # retries of invalid responses (validation errors)
+    # Send shortened field descriptions in the response schema, the response is still validated against the full model
+    compact_schema: bool = False
+    # Concurrent requests of a batch (LLMFactory.create_completion_batch)
+    max_concurrency: int = 8
+    # Client-side rate limits, set them to the account's quota. None means unlimited
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    # Retries of rate limit, overload and connection errors with jittered exponential backoff
+    rate_limit_retries: int = 5
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+    # Consecutive failures after which requests to the provider fail fast for the cooldown period
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_cooldown: float = 60.0
 
 class OpenAISettings(LLMProviderSettings):
     api_key: str = os.getenv("OPENAI_API_KEY")
@@ -18,12 +33,13 @@ class OpenAISettings(LLMProviderSettings):
 class AnthropicSettings(LLMProviderSettings):
     api_key: str = os.getenv("ANTHROPIC_API_KEY")
     default_model: str = "claude-3-5-sonnet-20240620"
-    max_tokens: int = 4096
 
 class LlamaSettings(LLMProviderSettings):
     api_key: str = "key"  # required, but not used
     default_model: str = "llama3"
-    base_url: str = "http://localhost:11434/v1"
+    base_url: str = os.getenv("LLAMA_BASE_URL", "http://localhost:11434/v1")
+    mode: str = "JSON"  # instructor mode, e.g. JSON, MD_JSON or TOOLS if the local model supports tool calling
+    max_concurrency: int = 4  # match the parallel slots of the local server (OLLAMA_NUM_PARALLEL)
 
 class GroqSettings(LLMProviderSettings):
     api_key: str = os.getenv("GROQ_API_KEY")
@@ -0,0 +1,136 @@
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # optional, the character heuristic is used without it
+    tiktoken = None
+
+logger = logging.getLogger("resume_builder")
+
+# Rough average for English text, used where an exact tokenizer is not needed
+CHARS_PER_TOKEN = 4
+
+# (context window, maximal output tokens) by model name prefix, the longest matching prefix wins
+MODEL_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gpt-4o-mini": (128000, 16384),
+    "gpt-4o": (128000, 16384),
+    "gpt-4-turbo": (128000, 4096),
+    "gpt-4": (8192, 4096),
+    "gpt-3.5-turbo": (16385, 4096),
+    # The June 2024 Sonnet returns 8192 tokens only with a beta header that is not sent
+    "claude-3-5-sonnet-20240620": (200000, 4096),
+    "claude-3-5-sonnet": (200000, 8192),
+    "claude-3-5-haiku": (200000, 8192),
+    "claude-3": (200000, 4096),
+    "mixtral-8x7b-32768": (32768, 8192),
+    "llama3": (8192, 4096),
+}
+DEFAULT_LIMITS = (8192, 4096)
+
+# Output sizing: a response is at least MIN_OUTPUT_TOKENS, the expected size gets OUTPUT_HEADROOM on top
+MIN_OUTPUT_TOKENS = 1024
+OUTPUT_HEADROOM = 1.5
+# Tokens of one JSON key with its punctuation and a short value
+TOKENS_PER_FIELD = 10
+
+class TokenBudgetError(ValueError):
+    """Raised before calling the provider when a request cannot fit into the model's context window."""
+
+@lru_cache(maxsize=None)
+def _encoding(model: Optional[str]):
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    # Close enough for models tiktoken does not know (Claude, Llama, Mixtral)
+    return tiktoken.get_encoding("cl100k_base")
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens of a text with tiktoken if it is installed, otherwise estimate them from the length.
+    """
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text, disallowed_special=())) + 1
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def message_text(message: Dict[str, Any]) -> str:
+    # Content is a string or a list of content blocks (e.g. Anthropic text blocks with cache_control)
+    content = message.get("content", "")
+    if isinstance(content, list):
+        return "\n".join(str(block.get("text", "")) if isinstance(block, dict) else str(block) for block in content)
+    return str(content)
+
+def estimate_message_tokens(messages: List[Dict[str, Any]], model: Optional[str] = None) -> int:
+    """
+    Estimate the number of input tokens of chat messages, including a small per-message overhead.
+    """
+    return sum(estimate_tokens(message_text(message), model) + 4 for message in messages)
+
+def model_limits(model: str) -> Tuple[int, int]:
+    """
+    Context window and maximal output tokens of a model.
+    """
+    prefixes = [prefix for prefix in MODEL_LIMITS if model.startswith(prefix)]
+    return MODEL_LIMITS[max(prefixes, key=len)] if prefixes else DEFAULT_LIMITS
+
+def schema_field_count(schema: Dict[str, Any], definitions: Optional[Dict[str, Any]] = None, depth: int = 0) -> int:
+    """
+    Number of fields of one instance of a JSON schema, nested objects resolved and lists counted with one item.
+    """
+    definitions = definitions if definitions is not None else schema.get("$defs", {})
+    if depth > 10:
+        return 1
+    if "$ref" in schema:
+        return schema_field_count(definitions.get(schema["$ref"].split("/")[-1], {}), definitions, depth + 1)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            return max(schema_field_count(option, definitions, depth + 1) for option in schema[key])
+    if "items" in schema:
+        return schema_field_count(schema["items"], definitions, depth + 1)
+    if "properties" in schema:
+        return sum(schema_field_count(value, definitions, depth + 1) for value in schema["properties"].values())
+    return 1
+
+def expected_output_tokens(json_schema: Dict[str, Any], input_tokens: int) -> int:
+    """
+    Expected size of the response: the JSON skeleton of the response model plus the content,
+    which for parsing and tailoring is about as long as the document in the prompt.
+    """
+    return schema_field_count(json_schema) * TOKENS_PER_FIELD + input_tokens
+
+def plan_max_tokens(model: str, prompt_tokens: int, schema_tokens: int, json_schema: Dict[str, Any],
+                    max_tokens: Optional[int] = None) -> int:
+    """
+    Check that a request fits into the context window of the model and choose its max_tokens.
+    Without an explicit `max_tokens` it is sized from the expected output with some headroom, so that long
+    responses are not cut off mid-JSON. Either way it is capped at the model's output limit.
+    Raises TokenBudgetError if the prompt leaves no room for the response.
+    """
+    context_window, output_limit = model_limits(model)
+    input_tokens = prompt_tokens + schema_tokens
+    available = context_window - input_tokens
+    if available < min(max_tokens or MIN_OUTPUT_TOKENS, MIN_OUTPUT_TOKENS):
+        raise TokenBudgetError(
+            f"Request of about {input_tokens} input tokens does not fit into the {context_window} token context of {model}, "
+            f"split the input into smaller parts"
+        )
+    if max_tokens is None:
+        expected = expected_output_tokens(json_schema, prompt_tokens)
+        if expected > min(output_limit, available):
+            logger.warning(f"Expected response of about {expected} tokens may not fit into the {min(output_limit, available)} output tokens left for {model}")
+        max_tokens = min(output_limit, max(MIN_OUTPUT_TOKENS, int(expected * OUTPUT_HEADROOM)))
+    return min(max_tokens, output_limit, available)
+
+def max_document_tokens(model: str, schema_tokens: int, json_schema: Dict[str, Any]) -> int:
+    """
+    Largest document that can be parsed in one request: the prompt, the schema and the expected response
+    (about as long as the document) have to fit into the context window and the response into the output limit.
+    """
+    context_window, output_limit = model_limits(model)
+    skeleton = schema_field_count(json_schema) * TOKENS_PER_FIELD
+    by_context = (context_window - schema_tokens - skeleton * OUTPUT_HEADROOM) / (1 + OUTPUT_HEADROOM)
+    by_output = output_limit / OUTPUT_HEADROOM - skeleton
+    return max(MIN_OUTPUT_TOKENS, int(min(by_context, by_output)))